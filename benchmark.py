@@ -0,0 +1,308 @@
+"""End-to-end latency benchmark for the caption pipeline.
+
+Plays WAV files through a fake microphone, recognizes and translates them
+with mock engines of configurable latency and failure rate, and sends the
+captions to a local TCP server standing in for the board. Reports the time
+from end of speech to bytes received by the board (p50/p95/p99) and the
+throughput in phrases per minute. Needs no network, microphone or API keys.
+
+    python benchmark.py                      # synthetic speech clips
+    python benchmark.py clips/*.wav --repeat 3 --recognize-latency 0.8 --fail-rate 0.05
+"""
+import argparse
+import json
+import math
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import wave
+
+import speech_recognition as sr
+
+import main
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+
+
+# --- Fake Microphone ---
+class FakeMicrophone(sr.AudioSource):
+    """Audio source that plays clips in real time (or `speed` times faster), separated by silence.
+
+    Records when the last sample of each clip was delivered, i.e. the moment
+    the speaker stopped talking. After the playlist it keeps returning
+    silence so the listener behaves as if the room went quiet.
+    """
+
+    def __init__(self, clips, gap_seconds=1.5, lead_in_seconds=1.5, speed=1.0):
+        self.SAMPLE_RATE = SAMPLE_RATE
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = CHUNK
+        self.stream = None
+        self.speed = speed
+        self.speech_end = {} # clip index -> wall-clock time its last sample was read
+        self.finished = threading.Event() # Set once every clip has been played
+        silence = lambda seconds: b"\0" * (int(SAMPLE_RATE * seconds) * SAMPLE_WIDTH)
+        self._timeline = [(None, silence(lead_in_seconds))] # The lead-in doubles as ambient-noise calibration
+        for index, clip in enumerate(clips):
+            self._timeline.append((index, clip))
+            self._timeline.append((None, silence(gap_seconds)))
+
+    def __enter__(self):
+        self.stream = _FakeStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class _FakeStream:
+    def __init__(self, mic):
+        self.mic = mic
+        self.segment = 0
+        self.offset = 0
+        self.next_read = time.monotonic()
+
+    def read(self, frames):
+        mic = self.mic
+        size = frames * SAMPLE_WIDTH
+        # Pace reads like a real sound card would
+        self.next_read += frames / SAMPLE_RATE / mic.speed
+        delay = self.next_read - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if self.segment >= len(mic._timeline):
+            mic.finished.set()
+            return b"\0" * size
+        index, data = mic._timeline[self.segment]
+        chunk = data[self.offset:self.offset + size]
+        self.offset += size
+        if self.offset >= len(data):
+            if index is not None:
+                mic.speech_end[index] = time.monotonic()
+            self.segment += 1
+            self.offset = 0
+        return chunk.ljust(size, b"\0")
+
+
+def load_wav(path):
+    """Reads a WAV file as 16 kHz, 16-bit mono PCM."""
+    with wave.open(path, "rb") as wav:
+        audio = sr.AudioData(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth())
+        if wav.getnchannels() != 1:
+            raise SystemExit(f"{path}: only mono WAV files are supported")
+    return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+
+def synthetic_clip(index, seconds):
+    """A tone burst standing in for speech; each clip has its own pitch so it can be told apart."""
+    frequency = 180 + 37 * index
+    samples = int(SAMPLE_RATE * seconds)
+    return b"".join(struct.pack("<h", int(6000 * math.sin(2 * math.pi * frequency * n / SAMPLE_RATE)))
+                    for n in range(samples))
+
+
+# --- Mock Engines ---
+def tag_clip(clip, index):
+    """Marks a clip with its playlist index in the lowest bit of 32 samples (inaudible).
+
+    Lets the mock recognizer tell repeated plays of the same recording apart.
+    """
+    tagged = bytearray(clip)
+    middle = (len(tagged) // 2) & ~1
+    for bit in range(32):
+        position = middle + bit * SAMPLE_WIDTH
+        if position < len(tagged):
+            tagged[position] = (tagged[position] & 0xFE) | ((index >> bit) & 1)
+    return bytes(tagged)
+
+def sample_latency(mean, jitter):
+    """Latency in seconds: mean with +/- jitter fraction, never negative."""
+    return max(0.0, random.gauss(mean, mean * jitter))
+
+class MockRecognizer(main.RecognizerBackend):
+    """Recognizer that "hears" which clip is in the audio and answers after a simulated delay."""
+
+    name = "Mock"
+
+    def __init__(self, clips, latency, jitter, fail_rate):
+        super().__init__()
+        # A slice from the middle of each clip identifies it inside the captured phrase
+        self.signatures = [clip[len(clip) // 2:len(clip) // 2 + 512] for clip in clips]
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+
+    def _recognize(self, recognizer, audio, lang_code):
+        time.sleep(sample_latency(self.latency, self.jitter))
+        if random.random() < self.fail_rate:
+            raise sr.RequestError("simulated recognition failure")
+        for index, signature in enumerate(self.signatures):
+            if signature in audio.frame_data:
+                return f"clip {index}"
+        raise sr.UnknownValueError()
+
+def make_mock_translator(latency, jitter, fail_rate):
+    def translate(text, target_lang_code):
+        time.sleep(sample_latency(latency, jitter))
+        if random.random() < fail_rate:
+            return None # Same as a real translator reporting an error
+        return f"[{target_lang_code}] {text}"
+    return translate
+
+
+# --- Stand-In Board ---
+class StandInBoard:
+    """Local TCP server that decodes caption frames and timestamps each one on arrival."""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self.received = {} # clip index -> wall-clock arrival time of its final caption
+        self.bytes_received = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        decoder = main.CaptionDecoder()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                now = time.monotonic()
+                self.bytes_received += len(data)
+                for kind, text in decoder.feed(data):
+                    match = re.search(r"clip (\d+)", text)
+                    if kind in (main.FRAME_FINAL, main.FRAME_FINAL_MULTI) and match:
+                        self.received.setdefault(int(match.group(1)), now)
+
+    def close(self):
+        self.server.close()
+
+
+# --- Benchmark ---
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_benchmark(clips, args):
+    """Plays `clips` through the full pipeline and returns the latency report."""
+    main.translation_cache = main.TranslationCache(path=None, max_size=args.cache_size)
+    main.calibration_cache = main.CalibrationCache(path=None) # Calibrate every run, like a first start
+    main.translation_memory = main.TranslationMemory()
+    main.TRANSLATION_MEMORY = args.memory # Mock captions differ only in their number, so every repeat would hit
+    # Synthetic tones have constant energy; an adapting threshold would climb past it and cut phrases short
+    main.DYNAMIC_ENERGY_THRESHOLD = not args.fixed_threshold
+    main.VAD_ENABLED = not args.no_vad
+    main.WIRE_FORMAT = args.wire_format
+    main.RECOGNIZER_BACKENDS["Mock"] = MockRecognizer(clips, args.recognize_latency, args.jitter, args.fail_rate)
+    main.TRANSLATORS["Mock"] = make_mock_translator(args.translate_latency, args.jitter, args.fail_rate)
+
+    board = StandInBoard()
+    mic = FakeMicrophone(clips, gap_seconds=args.gap, speed=args.speed)
+    core = main.PipelineCore(boards=[("127.0.0.1", board.port)], microphone_factory=lambda: mic)
+
+    def drain_log():
+        while True:
+            msg_type, value = main.gui_queue.get()
+            if args.verbose and msg_type == "log":
+                print(value)
+    threading.Thread(target=drain_log, daemon=True).start()
+
+    core.connect()
+    deadline = time.monotonic() + 5
+    while not core.connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if not core.connected:
+        raise SystemExit("Could not connect to the stand-in board")
+
+    started = time.monotonic()
+    core.start_listening("en", "Mock", "en", args.streaming, "Mock")
+    mic.finished.wait()
+    # Give the last phrases time to get through the pipeline
+    deadline = time.monotonic() + args.drain_timeout
+    while len(board.received) < len(mic.speech_end) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    core.stop_listening()
+    core.shutdown()
+    board.close()
+
+    latencies = [board.received[i] - mic.speech_end[i] for i in board.received if i in mic.speech_end]
+    elapsed = (max(board.received.values()) - started) if board.received else 0
+    report = {
+        "phrases": len(clips),
+        "delivered": len(latencies),
+        "lost": len(clips) - len(latencies),
+        "bytes_received": board.bytes_received,
+        "throughput_per_minute": round(len(latencies) / elapsed * 60, 2) if elapsed else 0.0,
+    }
+    # Where the time went, from the pipeline's own per-stage instrumentation
+    report["stage_p50_ms"] = {stage: round(stats["p50"] * 1000, 1) for stage, stats in main.metrics.summary().items()}
+    if latencies:
+        report.update({
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(max(latencies) * 1000, 1),
+        })
+    return report
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end latency benchmark.")
+    parser.add_argument("wavs", nargs="*", help="mono WAV files, one phrase each (default: synthetic clips)")
+    parser.add_argument("--synthetic", type=int, default=10, help="number of synthetic clips when no WAV is given")
+    parser.add_argument("--clip-seconds", type=float, default=2.0, help="length of each synthetic clip")
+    parser.add_argument("--repeat", type=int, default=1, help="play the playlist this many times")
+    parser.add_argument("--gap", type=float, default=1.5, help="seconds of silence between clips")
+    parser.add_argument("--speed", type=float, default=1.0, help="play audio this many times faster than real time")
+    parser.add_argument("--recognize-latency", type=float, default=0.5, help="mean mock recognition latency (s)")
+    parser.add_argument("--translate-latency", type=float, default=0.2, help="mean mock translation latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="latency standard deviation as a fraction of the mean")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability a mock call fails")
+    parser.add_argument("--cache-size", type=int, default=0, help="translation cache size (0 disables it)")
+    parser.add_argument("--memory", action="store_true", help="enable the fuzzy translation memory")
+    parser.add_argument("--streaming", action="store_true", help="benchmark the streaming (provisional caption) mode")
+    parser.add_argument("--fixed-threshold", action="store_true", default=None,
+                        help="disable the adaptive energy threshold (default: on for synthetic clips)")
+    parser.add_argument("--wire-format", default="framed", choices=["framed", "delta"],
+                        help="caption encoding on the link to the stand-in board")
+    parser.add_argument("--no-vad", action="store_true", help="send phrases untrimmed (compare with the VAD stage)")
+    parser.add_argument("--drain-timeout", type=float, default=10.0, help="seconds to wait for the last captions")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="print the pipeline log")
+    return parser.parse_args(argv)
+
+def main_benchmark(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    if args.fixed_threshold is None:
+        args.fixed_threshold = not args.wavs
+    if args.wavs:
+        clips = [load_wav(path) for path in args.wavs]
+    else:
+        clips = [synthetic_clip(index, args.clip_seconds) for index in range(args.synthetic)]
+    playlist = [tag_clip(clip, index) for index, clip in enumerate(clips * args.repeat)]
+    report = run_benchmark(playlist, args)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for key, value in report.items():
+            print(f"{key:>22}: {value}")
+
+if __name__ == "__main__":
+    main_benchmark()
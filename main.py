@@ -1,18 +1,124 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+import argparse
+import importlib
+import importlib.util
+import signal
 import socket
 import threading
 import time
-import speech_recognition as sr
-from googletrans import Translator as GoogleTranslator # Using the unofficial library for simplicity
-import deepl
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging
+import logging.handlers
+import os
+import json
+import asyncio
+import struct
+import zlib
+import sqlite3
+import math
+import random
+import re
+from collections import OrderedDict, deque, namedtuple
 import queue # For thread-safe communication with GUI
 
+
+class LazyModule:
+    """Stand-in for a heavy module that is only imported on first attribute access.
+
+    Keeps startup (and restart after a crash) fast: the GUI toolkit, speech
+    and translation libraries load only when the chosen backend uses them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return getattr(module, attr)
+
+
+sr = LazyModule("speech_recognition")
+googletrans = LazyModule("googletrans") # Using the unofficial library for simplicity
+deepl = LazyModule("deepl")
+audioop = LazyModule("audioop") # Same energy measure speech_recognition uses to detect phrases
+# GUI modules are imported by run_gui(); the headless mode never loads tkinter
+tk = ttk = messagebox = scrolledtext = None
+
 # --- Configuration ---
 BOARD_IP = "192.168.1.100"  # !!! استبدل بعنوان IP الخاص باللوحة الإلكترونية !!!
 BOARD_PORT = 9999          # !!! استبدل بالمنفذ الذي تستمع إليه اللوحة !!!
-RECONNECT_DELAY = 5      # Delay in seconds before attempting reconnection
+# Every board driven by this microphone; more than one entry uses the asyncio fan-out transport
+BOARDS = [
+    (BOARD_IP, BOARD_PORT),
+]
+RECONNECT_DELAY = 0.5    # First delay in seconds before reconnecting; doubles (with jitter) after each failure
+RECONNECT_DELAY_MAX = 30 # Longest delay between reconnection attempts
+TCP_KEEPALIVE_IDLE = 2   # Seconds of silence before the board link is probed
+TCP_KEEPALIVE_INTERVAL = 1 # Seconds between keepalive probes
+TCP_KEEPALIVE_COUNT = 3  # Unanswered probes after which the board link is considered dead
+OUTBOX_REPLAY = "all"    # Captions queued while the board was offline: "all" are sent on reconnect, or only the "newest"
+OUTBOX_SPOOL_PATH = None # Also keep them in this file so they survive a restart (None = memory only)
+BOARD_OUTBOX_SIZE = 32   # Max captions waiting for one board in the fan-out transport
+WIRE_FORMAT = "framed"   # "framed" (type + length prefixed messages), "delta" (framed, updates carry only the
+                         # changed span) or "raw" (bare UTF-8 text, for old boards)
+WIRE_COMPRESS_MIN = 200  # "delta" format: payloads of at least this many bytes are zlib-compressed if that helps
+DELTA_RESYNC_SECONDS = 10 # "delta" format: the full caption is sent again at least this often
+NETWORK_QUEUE_SIZE = 32  # Max captions waiting for the board; stale ones are dropped beyond this
+SEND_BATCH_MAX = 16      # Max queued captions coalesced into a single write
+METRICS_HTTP_PORT = None # Serve Prometheus-format metrics on http://127.0.0.1:<port>/metrics (None = off)
+METRICS_FILE = None      # Write Prometheus-format metrics to this file for a textfile collector (None = off)
+METRICS_FILE_INTERVAL = 10 # Seconds between metrics file updates
+LOG_MAX_LINES = 1000     # Lines kept in the GUI log; older ones are trimmed
+LOG_FILE = None          # Full log history goes to this rotating file (None = off)
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024 # Size at which the log file rotates
+LOG_FILE_BACKUPS = 5     # Rotated log files kept
+GUI_TICK_MIN_MS = 50     # GUI queue polling interval while messages are arriving
+GUI_TICK_MAX_MS = 500    # GUI queue polling interval when idle
+GUI_MAX_MESSAGES_PER_TICK = 500 # Messages handled per tick so a burst cannot freeze the window
 DEEPL_AUTH_KEY = "YOUR_DEEPL_API_KEY"  # !!! استبدل بمفتاح DeepL API الخاص بك !!!
+TRANSLATOR_POOL_SIZE = 4 # Max idle (kept-alive) clients kept per translation service
+TRANSLATION_CACHE_PATH = "translation_cache.sqlite3" # On-disk store for cached translations (None = memory only)
+TRANSLATION_CACHE_SIZE = 2000 # Max translations kept in memory
+TRANSLATION_CACHE_TTL = 7 * 24 * 3600 # Seconds a cached translation stays valid
+TRANSLATION_MEMORY = True # Reuse the translation of a near-identical earlier phrase (numbers are substituted)
+TRANSLATION_MEMORY_SIZE = 5000 # Phrases kept in the translation memory
+TRANSLATION_MEMORY_THRESHOLD = 0.85 # Word overlap (Dice, 0-1) a remembered phrase needs to be reused
+EXECUTION_MODE = "threads" # "threads", or "processes": recognition (with its FLAC encoding) and translation requests
+                           # run in worker processes so they never compete with the GUI for the GIL
+PROCESS_POOL_SIZE = None # Worker processes in "processes" mode (None = one per CPU core, leaving one for the GUI)
+RECOGNITION_WORKERS = 2 # Phrases recognized in parallel
+TRANSLATION_WORKERS = 2 # Phrases translated in parallel
+TRANSLATION_BATCH_MAX = 4 # Queued phrases a translation worker sends to the provider in one go
+MULTI_TARGET_WORKERS = 6 # Concurrent provider requests when translating into several languages
+HEDGE_TRANSLATION = False # Also ask the other provider when the selected one is slow or failing
+HEDGE_PROVIDERS = ["Google", "DeepL"] # Providers tried after the selected one, in order
+HEDGE_DELAY = 1.2 # Seconds to wait for the selected provider before asking the next one
+BREAKER_FAILURE_THRESHOLD = 3 # Consecutive failures after which a provider is skipped
+BREAKER_RESET_TIMEOUT = 30 # Seconds a skipped provider rests before one probe request is let through
+STAGE_QUEUE_SIZE = 8 # Max phrases waiting between two pipeline stages
+OVERLOAD_POLICY = "drop_oldest" # When a stage queue is full: "block", "drop_oldest" or "drop_newest"
+SEQUENCE_HOLD_TIMEOUT = 20 # Seconds a finished phrase may wait for an earlier, still running one
+PHRASE_TIME_LIMIT = 15 # Max seconds of speech in one phrase
+DYNAMIC_ENERGY_THRESHOLD = True # Keep adapting the speech/silence threshold to room noise while listening
+CALIBRATION_CACHE_PATH = "calibration.json" # Energy thresholds remembered per input device (None = memory only)
+CALIBRATION_MAX_AGE = 6 * 3600 # Seconds a remembered threshold is used instead of calibrating at start
+CALIBRATION_SAVE_INTERVAL = 60 # Seconds between saves of the threshold as it adapts while listening
+STREAMING_MODE = False # Send provisional captions while a phrase is still being spoken
+VAD_ENABLED = True # Trim silence, drop noise-only phrases and split long ones at pauses before recognition (needs numpy)
+VAD_FRAME_MS = 30 # Length of the frames whose energy is compared with the speech threshold
+VAD_MIN_SPEECH_SECONDS = 0.25 # Phrases (or pieces) with less speech than this are dropped without being uploaded
+VAD_PADDING_SECONDS = 0.2 # Silence kept before and after the speech so word edges are not clipped
+VAD_SPLIT_SECONDS = 6 # Phrases longer than this are split at pauses (0 = never split)
+VAD_SPLIT_PAUSE_SECONDS = 0.4 # Shortest pause a long phrase is split at
+STREAM_WINDOW_SECONDS = 3.0 # Length of each provisional recognition window
+STREAM_HOP_SECONDS = 1.5 # New speech needed before the next window (windows overlap by the difference)
 
 # --- Language Codes ---
 LANGUAGES = {
@@ -26,6 +132,15 @@ DEEPL_LANG_MAP = {
     "en": "EN-US", # Or "EN-GB"
     "fr": "FR",
 }
+# Speech recognition engine used by default ("Google" needs internet; "Whisper", "Vosk" and "Sphinx" run locally)
+RECOGNIZER_BACKEND = "Google"
+WHISPER_MODEL = "base" # faster-whisper model size or path ("tiny", "base", "small", ...)
+# Vosk model directories per language (download from https://alphacephei.com/vosk/models)
+VOSK_MODEL_PATHS = {
+    "ar": "models/vosk-model-ar",
+    "en": "models/vosk-model-small-en-us",
+    "fr": "models/vosk-model-small-fr",
+}
 # Mapping for Speech Recognition languages
 SR_LANG_MAP = {
     "ar": "ar-SA",
@@ -33,204 +148,2561 @@ SR_LANG_MAP = {
     "fr": "fr-FR",
 }
 
+# One caption for the board; provisional captions (final=False) are replaced by later ones for the same phrase.
+# `timing` is the PhraseTiming of a final caption (None for provisional ones).
+Caption = namedtuple("Caption", "seq text final timing", defaults=(None,))
+
+# --- Caption Queue ---
+class CaptionQueue(queue.Queue):
+    """Bounded queue of captions for the board that never blocks the producer.
+
+    Any new caption replaces a queued provisional caption of the same phrase,
+    and a provisional caption that arrives after the final caption of its
+    phrase (or of a later one) was queued is dropped. When the queue is full
+    the stalest caption is dropped: provisional captions first, then the
+    oldest final one. None items (wake-ups for the network thread) are never
+    dropped.
+
+    This is also the outbox while the board is offline: captions wait here
+    for the reconnect, and with `spool_path` the final ones are mirrored to a
+    file so they survive a restart.
+    """
+
+    def __init__(self, maxsize=NETWORK_QUEUE_SIZE, spool_path=OUTBOX_SPOOL_PATH):
+        super().__init__(maxsize)
+        self.dropped = 0
+        self.spool_path = spool_path
+        self.offline = True # Set by the network thread; changes are spooled only while offline
+        self.final_seq = -1 # Highest seq with a final caption queued or sent; provisional captions up to it are stale
+        self._spooled = False
+        if spool_path:
+            self._load_spool()
+
+    def _load_spool(self):
+        try:
+            with open(self.spool_path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log_to_gui(f"Outbox spool unreadable, ignoring it: {e}")
+            return
+        for entry in entries[-self.maxsize:] if self.maxsize > 0 else entries:
+            self._put(Caption(entry["seq"], entry["text"], True))
+            self.unfinished_tasks += 1
+        self._spooled = bool(entries)
+
+    def _write_spool(self):
+        """Mirrors the queued final captions to the spool file (call with the mutex held)."""
+        captions = [caption for caption in self.queue if caption is not None and caption.final]
+        if not captions:
+            self.clear_spool()
+            return
+        try:
+            with open(self.spool_path + ".tmp", "w", encoding="utf-8") as f:
+                for caption in captions:
+                    f.write(json.dumps({"seq": caption.seq, "text": caption.text}, ensure_ascii=False) + "\n")
+            os.replace(self.spool_path + ".tmp", self.spool_path)
+            self._spooled = True
+        except OSError as e:
+            log_to_gui(f"Outbox spool write failed: {e}")
+
+    def clear_spool(self):
+        """Removes the spool file once its captions have reached the board."""
+        if self._spooled:
+            self._spooled = False
+            with contextlib.suppress(OSError):
+                os.remove(self.spool_path)
+
+    def set_offline(self, offline):
+        """Called by the network thread when the board link goes down or comes back."""
+        with self.mutex:
+            self.offline = offline
+            if offline and self.spool_path:
+                self._write_spool()
+
+    def requeue(self, captions):
+        """Puts captions that could not be sent back at the front, oldest first."""
+        with self.mutex:
+            for caption in reversed(captions):
+                self.queue.appendleft(caption)
+                self.unfinished_tasks += 1
+            if self.offline and self.spool_path:
+                self._write_spool()
+            self.not_empty.notify()
+
+    def keep_newest(self):
+        """Drops every queued caption except the newest (final if there is one); returns how many were dropped."""
+        with self.mutex:
+            captions = [caption for caption in self.queue if caption is not None]
+            if len(captions) < 2:
+                return 0
+            finals = [caption for caption in captions if caption.final]
+            newest = finals[-1] if finals else captions[-1]
+            for caption in captions:
+                if caption is not newest:
+                    self.queue.remove(caption)
+                    self.unfinished_tasks -= 1
+            if self.spool_path:
+                self._write_spool()
+            return len(captions) - 1
+
+    def restart_sequence(self):
+        """Called when a new listener starts numbering its phrases from 0 again."""
+        with self.mutex:
+            self.final_seq = -1
+
+    def put(self, item, block=True, timeout=None):
+        with self.mutex:
+            if item is not None:
+                if not item.final and item.seq <= self.final_seq:
+                    return # Late provisional text must never replace the final caption on the board
+                if item.final:
+                    self.final_seq = max(self.final_seq, item.seq)
+                # Merge: a newer caption of a phrase makes its queued provisional text stale
+                for queued in list(self.queue):
+                    if queued is not None and not queued.final and queued.seq == item.seq:
+                        self.queue.remove(queued)
+                        self.unfinished_tasks -= 1
+                captions = [queued for queued in self.queue if queued is not None]
+                if self.maxsize > 0 and len(captions) >= self.maxsize:
+                    stale = next((queued for queued in captions if not queued.final), captions[0])
+                    self.queue.remove(stale)
+                    self.unfinished_tasks -= 1
+                    self.dropped += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            if item is not None and item.final and self.offline and self.spool_path:
+                self._write_spool()
+            self.not_empty.notify()
+
 # --- Global Variables & Flags ---
-connection_thread = None
-mic_thread = None
-stop_mic_listening = None # Function to stop background listener
-network_queue = queue.Queue() # Queue to send data to network thread safely
-gui_queue = queue.Queue() # Queue to send status updates to GUI thread safely
+gui_queue = queue.Queue() # Queue to send status updates to GUI (or the headless log printer) thread safely
+
+# --- Metrics ---
+class PhraseTiming:
+    """Timestamps one phrase collects on its way from the microphone to the board."""
+
+    # (stage, start point, end point)
+    STAGES = (
+        ("recognition_wait", "captured", "recognition_start"),
+        ("recognition", "recognition_start", "recognized"),
+        ("translation_wait", "recognized", "translation_start"),
+        ("translation", "translation_start", "translated"),
+        ("ordering_wait", "translated", "released"),
+        ("network_queue_wait", "released", "send_start"),
+        ("send", "send_start", "sent"),
+        ("end_to_end", "captured", "sent"),
+    )
+
+    def __init__(self):
+        self.marks = {"captured": time.monotonic()}
+
+    def mark(self, point):
+        self.marks[point] = time.monotonic()
+
+    def durations(self):
+        """Seconds spent in every stage both of whose points were reached."""
+        return {stage: self.marks[end] - self.marks[start]
+                for stage, start, end in self.STAGES if start in self.marks and end in self.marks}
+
+
+class PipelineMetrics:
+    """Stage latencies, queue depths and counters, exportable in Prometheus text format."""
+
+    def __init__(self, window=500):
+        self._samples = {} # stage -> deque of recent durations (seconds)
+        self._totals = {} # stage -> [count, sum]
+        self._counters = {}
+        self._gauges = {} # name -> callable returning the current value
+        self._window = window
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+            totals = self._totals.setdefault(stage, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def record_phrase(self, timing):
+        """Records every stage duration of a phrase that reached the board."""
+        for stage, seconds in timing.durations().items():
+            self.observe(stage, seconds)
+        self.increment("phrases_sent")
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def set_gauge(self, name, read):
+        """Registers a callable that reports a current value (e.g. a queue depth); None removes it."""
+        with self._lock:
+            if read is None:
+                self._gauges.pop(name, None)
+            else:
+                self._gauges[name] = read
+
+    def gauges(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+        values = {}
+        for name, read in gauges.items():
+            try:
+                values[name] = read()
+            except Exception:
+                pass
+        return values
+
+    def summary(self):
+        """{stage: {"p50", "p95", "count"}} over the recent window."""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+        return {stage: {"p50": values[len(values) // 2], "p95": values[int(len(values) * 0.95)], "count": len(values)}
+                for stage, values in samples.items() if values}
+
+    def render_prometheus(self):
+        """Current metrics in the Prometheus text exposition format."""
+        lines = ["# TYPE caption_stage_seconds summary"]
+        summary = self.summary()
+        with self._lock:
+            totals = {stage: list(values) for stage, values in self._totals.items()}
+            counters = dict(self._counters)
+        for stage, stats in summary.items():
+            lines.append(f'caption_stage_seconds{{stage="{stage}",quantile="0.5"}} {stats["p50"]:.6f}')
+            lines.append(f'caption_stage_seconds{{stage="{stage}",quantile="0.95"}} {stats["p95"]:.6f}')
+            lines.append(f'caption_stage_seconds_sum{{stage="{stage}"}} {totals[stage][1]:.6f}')
+            lines.append(f'caption_stage_seconds_count{{stage="{stage}"}} {totals[stage][0]}')
+        lines.append("# TYPE caption_gauge gauge")
+        for name, value in sorted(self.gauges().items()):
+            lines.append(f'caption_gauge{{name="{name}"}} {value}')
+        lines.append("# TYPE caption_events_total counter")
+        for name, value in sorted(counters.items()):
+            lines.append(f'caption_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+metrics = PipelineMetrics()
+
+def start_metrics_export(http_port=METRICS_HTTP_PORT, path=METRICS_FILE, interval=METRICS_FILE_INTERVAL):
+    """Starts the optional metrics HTTP endpoint and/or the periodic metrics file writer."""
+    if http_port:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Keep scrapes out of the log
+
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", http_port), MetricsHandler)
+        except OSError as e:
+            log_to_gui(f"Metrics endpoint disabled: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            log_to_gui(f"Metrics available at http://127.0.0.1:{http_port}/metrics")
 
-is_connected = False
-is_listening = False
-app_running = True # Flag to signal threads to stop
+    if path:
+        def write_forever():
+            while True:
+                try:
+                    with open(path + ".tmp", "w", encoding="utf-8") as f:
+                        f.write(metrics.render_prometheus())
+                    os.replace(path + ".tmp", path) # Scrapers never see a half-written file
+                except OSError as e:
+                    log_to_gui(f"Metrics file write failed: {e}")
+                time.sleep(interval)
+        threading.Thread(target=write_forever, daemon=True).start()
+
+# --- Translator Client Pool ---
+def _create_google_client():
+    """Builds a Google Translate client (owns its own keep-alive HTTP session)."""
+    return googletrans.Translator()
+
+def _create_deepl_client():
+    """Builds a DeepL client (owns its own keep-alive HTTP session)."""
+    return deepl.Translator(DEEPL_AUTH_KEY)
+
+def _warm_up_google_client(client):
+    """Opens the HTTPS connection and fetches the token before the first real phrase."""
+    client.detect("hello")
+
+def _warm_up_deepl_client(client):
+    """Opens the HTTPS connection with a quota-free authenticated call."""
+    client.get_usage()
+
+def _close_client(client):
+    """Closes the HTTP session held by a translator client, ignoring errors."""
+    try:
+        if hasattr(client, "close"): # deepl.Translator
+            client.close()
+        elif hasattr(client, "client"): # googletrans keeps an httpx.Client
+            client.client.close()
+    except Exception:
+        pass
+
+class TranslatorClientPool:
+    """Keeps long-lived translator clients per service and shares them safely across threads.
+
+    A client is checked out by exactly one thread at a time (the underlying
+    libraries are not guaranteed thread-safe), returned to the pool after use
+    so its connection stays alive, and thrown away when it raises so the next
+    request gets a freshly built one.
+    """
+
+    FACTORIES = {
+        "Google": _create_google_client,
+        "DeepL": _create_deepl_client,
+    }
+    WARM_UP = {
+        "Google": _warm_up_google_client,
+        "DeepL": _warm_up_deepl_client,
+    }
+
+    def __init__(self, max_idle=TRANSLATOR_POOL_SIZE):
+        self.max_idle = max_idle
+        self._idle = {} # service -> list of idle clients (LIFO keeps the warmest connection in use)
+        self._lock = threading.Lock()
+
+    def _acquire(self, service):
+        with self._lock:
+            idle = self._idle.get(service)
+            if idle:
+                return idle.pop()
+        return self.FACTORIES[service]() # Build outside the lock, it may be slow
+
+    def _release(self, service, client):
+        with self._lock:
+            idle = self._idle.setdefault(service, [])
+            if len(idle) < self.max_idle:
+                idle.append(client)
+                return
+        _close_client(client)
+
+    @contextlib.contextmanager
+    def client(self, service, keep_on=()):
+        """Checks out a client for `service`.
+
+        Errors listed in `keep_on` are API-level (quota, bad request) and leave
+        the client pooled; any other error marks it broken so it is rebuilt.
+        """
+        client = self._acquire(service)
+        try:
+            yield client
+        except Exception as e:
+            if isinstance(e, keep_on):
+                self._release(service, client)
+            else:
+                _close_client(client)
+            raise
+        self._release(service, client)
+
+    def warm_up(self, service):
+        """Builds and connects a client for `service` in the background so the first phrase is fast."""
+        def _warm():
+            try:
+                with self.client(service) as client:
+                    self.WARM_UP[service](client)
+                log_to_gui(f"{service} translator connection ready.")
+            except Exception as e:
+                log_to_gui(f"{service} translator warm-up failed: {e}")
+        threading.Thread(target=_warm, daemon=True).start()
+
+    def close(self, service=None):
+        """Closes idle clients for one service (or all services)."""
+        with self._lock:
+            services = [service] if service else list(self._idle)
+            clients = [c for name in services for c in self._idle.pop(name, [])]
+        for client in clients:
+            _close_client(client)
+
+translator_pool = TranslatorClientPool()
+
+# --- Translation Cache ---
+class TranslationCache:
+    """In-memory LRU of translations with a TTL, persisted to a local SQLite file.
+
+    Keys are (service, source, target, text). Memory misses fall back to the
+    on-disk store so the cache survives restarts; every new translation is
+    written through to disk.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_PATH, max_size=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (translation, stored_at), most recently used last
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS translations ("
+                                 "service TEXT, source TEXT, target TEXT, text TEXT, "
+                                 "translation TEXT, stored_at REAL, "
+                                 "PRIMARY KEY (service, source, target, text))")
+                self._db.execute("DELETE FROM translations WHERE stored_at < ?", (time.time() - ttl,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                log_to_gui(f"Translation cache disabled on disk: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(service, source, target, text):
+        """Builds the cache key; whitespace differences do not create new entries."""
+        return (service, source or "", target, " ".join(text.split()))
+
+    def get(self, key):
+        """Returns the cached translation for `key`, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry: # Expired
+                del self._entries[key]
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT translation, stored_at FROM translations "
+                                           "WHERE service=? AND source=? AND target=? AND text=?", key).fetchone()
+                except sqlite3.Error:
+                    row = None
+            if row and now - row[1] <= self.ttl:
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, translation):
+        """Stores a translation in memory and on disk."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, translation, now)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                                     key + (translation, now))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    log_to_gui(f"Translation cache write failed: {e}")
+
+    def _remember(self, key, translation, stored_at):
+        """Inserts into the in-memory LRU (lock must be held)."""
+        self._entries[key] = (translation, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def recent(self, limit):
+        """The newest stored (service, source, target, text, translation) rows from disk, oldest first."""
+        with self._lock:
+            if self._db is None:
+                return []
+            try:
+                rows = self._db.execute("SELECT service, source, target, text, translation FROM translations "
+                                        "ORDER BY stored_at DESC LIMIT ?", (limit,)).fetchall()
+            except sqlite3.Error:
+                return []
+        return rows[::-1]
+
+    def stats(self):
+        """Returns the hit/miss/eviction counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+    def close(self):
+        """Closes the on-disk store."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+# Shared caches are opened on first use, so importing this module (a worker process, the benchmark) never touches disk
+_shared_cache_lock = threading.RLock()
+translation_cache = None # TranslationCache, see get_translation_cache()
+
+def get_translation_cache():
+    """The shared TranslationCache, opened on first use."""
+    global translation_cache
+    with _shared_cache_lock:
+        if translation_cache is None:
+            translation_cache = TranslationCache()
+        return translation_cache
+
+# --- Translation Memory ---
+def substitute_numbers(translation, old_numbers, new_numbers):
+    """Rewrites the numbers of a remembered translation for the new phrase; None if that is not possible."""
+    mapping = {}
+    for old, new in zip(old_numbers, new_numbers):
+        if mapping.setdefault(old, new) != new:
+            return None # The same number became two different ones
+    changed = {old for old, new in mapping.items() if old != new}
+    if not changed:
+        return translation
+    if not changed <= set(re.findall(r"\d+", translation)):
+        return None # The translation writes the number differently (e.g. in words)
+    return re.sub(r"\d+", lambda match: mapping.get(match.group(), match.group()), translation)
+
+# Words that reverse a phrase's meaning; phrases that differ in one of them are never reused for each other
+NEGATION_WORDS = frozenset({
+    "not", "no", "never", "none", "nothing", "nobody", "neither", "nor", "cannot", "without", # English
+    "ne", "pas", "non", "jamais", "rien", "aucun", "aucune", "personne", "sans", # French
+    "لا", "لم", "لن", "ليس", "ليست", "ما", "غير", "بدون", "دون", # Arabic
+})
+
+def is_negation(word):
+    return word in NEGATION_WORDS or word.endswith("n't") or word.startswith("n'")
+
+class TranslationMemory:
+    """Finds earlier translations of near-identical phrases ("gate 12 is now boarding" / "gate 14 now boarding").
+
+    Phrases are lower-cased and split into words, with every number replaced
+    by a placeholder; the Dice overlap of their words (repeats counted) must
+    reach `threshold`. Word overlap alone ignores order and meaning, so two
+    phrases that differ by a negation word, or whose shared words come in a
+    different order ("from london to paris" / "from paris to london"), are
+    never matched whatever their score. An inverted index per (service,
+    source, target) finds candidates; only the rarest words of the query are
+    looked up (a phrase that shares none of them cannot reach the threshold),
+    which keeps lookups well under a millisecond. On a match the numbers of
+    the new phrase are substituted into the remembered translation.
+    """
+
+    def __init__(self, max_size=TRANSLATION_MEMORY_SIZE, threshold=TRANSLATION_MEMORY_THRESHOLD):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.lookups = 0
+        self.hits = 0
+        self._entries = OrderedDict() # id -> (scope, words, numbers, features, translation), most recently used last
+        self._ids = {} # (scope, words, numbers) -> id
+        self._postings = {} # (scope, feature) -> ids of phrases containing it
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def analyze(text):
+        """(words with numbers as "#", the numbers in order, frozenset of word features).
+
+        Repeated words are numbered so that the set overlap counts them as often as they occur.
+        """
+        words = re.findall(r"\w+(?:'\w+)*", text.lower())
+        numbers = tuple(word for word in words if word.isdigit())
+        words = tuple("#" if word.isdigit() else word for word in words)
+        seen = {}
+        features = set()
+        for word in words:
+            features.add((word, seen.get(word, 0)))
+            seen[word] = seen.get(word, 0) + 1
+        return words, numbers, frozenset(features)
+
+    @staticmethod
+    def compatible(words, other_words):
+        """False if the phrases differ by a negation word or list their shared words in a different order."""
+        counts, other_counts = {}, {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for word in other_words:
+            other_counts[word] = other_counts.get(word, 0) + 1
+        for word in counts.keys() | other_counts.keys():
+            if counts.get(word, 0) != other_counts.get(word, 0) and is_negation(word):
+                return False
+        # Words that occur once in each phrase must keep their order
+        anchors = {word for word, count in counts.items() if count == 1 and other_counts.get(word) == 1}
+        return [word for word in words if word in anchors] == [word for word in other_words if word in anchors]
+
+    def add(self, translator_service, source_lang_code, target_lang_code, text, translation):
+        words, numbers, features = self.analyze(text)
+        if not words:
+            return
+        scope = (translator_service, source_lang_code or "", target_lang_code)
+        with self._lock:
+            previous = self._ids.get((scope, words, numbers))
+            if previous is not None:
+                self._remove(previous)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, words, numbers, features, translation)
+            self._ids[(scope, words, numbers)] = entry_id
+            for feature in features:
+                self._postings.setdefault((scope, feature), set()).add(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id):
+        """Drops one phrase from the index (lock must be held)."""
+        scope, words, numbers, features, _ = self._entries.pop(entry_id)
+        del self._ids[(scope, words, numbers)]
+        for feature in features:
+            ids = self._postings[(scope, feature)]
+            ids.discard(entry_id)
+            if not ids:
+                del self._postings[(scope, feature)]
+
+    def load(self, rows):
+        """Seeds the memory from (service, source, target, text, translation) rows, oldest first."""
+        for translator_service, source_lang_code, target_lang_code, text, translation in rows:
+            self.add(translator_service, source_lang_code, target_lang_code, text, translation)
+
+    def lookup(self, translator_service, source_lang_code, target_lang_code, text):
+        """Returns (translation, similarity) of the closest remembered phrase, or None below the threshold."""
+        words, numbers, features = self.analyze(text)
+        if not words:
+            return None
+        scope = (translator_service, source_lang_code or "", target_lang_code)
+        with self._lock:
+            self.lookups += 1
+            # A match shares at least `needed` features, so it contains one of the len - needed + 1 rarest ones
+            needed = math.ceil(len(features) * self.threshold / (2 - self.threshold))
+            rarest = sorted(features, key=lambda feature: len(self._postings.get((scope, feature), ())))
+            candidates = set()
+            for feature in rarest[:len(features) - needed + 1]:
+                candidates.update(self._postings.get((scope, feature), ()))
+            matches = []
+            for entry_id in candidates:
+                _, other_words, other_numbers, other_features, _ = self._entries[entry_id]
+                if len(other_numbers) != len(numbers):
+                    continue
+                score = 2 * len(features & other_features) / (len(features) + len(other_features))
+                if score >= self.threshold:
+                    matches.append((score, entry_id, other_words))
+            for score, entry_id, other_words in sorted(matches, reverse=True):
+                if not self.compatible(words, other_words):
+                    continue
+                _, _, other_numbers, _, translation = self._entries[entry_id]
+                translation = substitute_numbers(translation, other_numbers, numbers)
+                if translation is None:
+                    continue
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return translation, score
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {"lookups": self.lookups, "hits": self.hits, "size": len(self._entries)}
+
+translation_memory = None # TranslationMemory, see get_translation_memory()
+
+def get_translation_memory():
+    """The shared TranslationMemory, seeded from the translation cache on first use."""
+    global translation_memory
+    with _shared_cache_lock:
+        if translation_memory is None:
+            translation_memory = TranslationMemory()
+            if TRANSLATION_MEMORY:
+                translation_memory.load(get_translation_cache().recent(TRANSLATION_MEMORY_SIZE))
+        return translation_memory
 
 # --- Translation Functions ---
 def translate_text_google(text, target_lang_code):
     """Translates text using Google Translate library."""
     try:
-        translator = GoogleTranslator()
-        # Detect source language automatically or specify if needed
-        translation = translator.translate(text, dest=target_lang_code)
+        with translator_pool.client("Google") as translator:
+            # Detect source language automatically or specify if needed
+            translation = translator.translate(text, dest=target_lang_code)
         return translation.text
     except Exception as e:
         log_to_gui(f"Google Translate Error: {e}")
         return None
 
-def translate_text_deepl(text, target_lang_code):
-    """Translates text using DeepL API."""
+def translate_texts_deepl(texts, target_lang_code):
+    """Translates several texts into one language with a single DeepL API request."""
     if not DEEPL_AUTH_KEY or DEEPL_AUTH_KEY == "YOUR_DEEPL_API_KEY":
         log_to_gui("Error: DeepL API Key not configured.")
-        return None
+        return [None] * len(texts)
     try:
-        translator = deepl.Translator(DEEPL_AUTH_KEY)
         deepl_target = DEEPL_LANG_MAP.get(target_lang_code, "EN-US") # Default to English if map fails
-        result = translator.translate_text(text, target_lang=deepl_target)
-        return result.text
+        # These errors do not mean the connection is broken
+        api_errors = (deepl.AuthorizationException, deepl.QuotaExceededException, deepl.TooManyRequestsException)
+        with translator_pool.client("DeepL", keep_on=api_errors) as translator:
+            results = translator.translate_text(list(texts), target_lang=deepl_target)
+        return [result.text for result in results]
     except deepl.DeepLException as e:
         log_to_gui(f"DeepL Error: {e}")
-        return None
+        return [None] * len(texts)
     except Exception as e:
         log_to_gui(f"DeepL General Error: {e}")
-        return None
+        return [None] * len(texts)
 
-# --- Network Handling ---
-def network_manager(host, port):
-    """Manages the TCP connection, reconnection, and sending data."""
-    global is_connected, app_running
-    sock = None
+def translate_text_deepl(text, target_lang_code):
+    """Translates text using DeepL API."""
+    return translate_texts_deepl([text], target_lang_code)[0]
 
-    while app_running:
-        if sock is None: # Try to connect if not connected
-            is_connected = False
-            log_to_gui(f"Attempting to connect to {host}:{port}...")
-            try:
-                # Create a new socket and connect
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5) # Connection timeout
-                sock.connect((host, port))
-                sock.settimeout(None) # Reset timeout after connection
-                is_connected = True
-                log_to_gui("Connection established.")
-                update_gui_connection_status(True)
+TRANSLATORS = {
+    "Google": translate_text_google,
+    "DeepL": translate_text_deepl,
+}
+# Services that translate a list of texts in one request (others get one request per text)
+BATCH_TRANSLATORS = {
+    "DeepL": translate_texts_deepl,
+}
 
-            except socket.error as e:
-                log_to_gui(f"Connection failed: {e}. Retrying in {RECONNECT_DELAY}s...")
-                sock = None # Ensure socket is None if connection failed
-                update_gui_connection_status(False)
-                # Wait before retrying, but check if app should stop
-                for _ in range(RECONNECT_DELAY):
-                    if not app_running: return
-                    time.sleep(1)
-                continue # Retry connection
-
-        # If connected, process the sending queue
-        if sock and is_connected:
-            try:
-                # Wait for data to send (with timeout to allow checking app_running)
-                data_to_send = network_queue.get(timeout=0.5)
-                if data_to_send is None: # Sentinel value to stop
-                    break
-                log_to_gui(f"Sending: {data_to_send}")
-                sock.sendall(data_to_send.encode('utf-8'))
-                network_queue.task_done() # Mark task as completed
+translation_executor = ThreadPoolExecutor(max_workers=MULTI_TARGET_WORKERS, thread_name_prefix="translate")
+# Separate pool for the provider calls of hedged requests (they are started from translation_executor threads)
+hedge_executor = ThreadPoolExecutor(max_workers=MULTI_TARGET_WORKERS * len(HEDGE_PROVIDERS), thread_name_prefix="hedge")
+
+def translator_configured(service):
+    """False for providers that cannot work with the current configuration (DeepL without a key)."""
+    return service != "DeepL" or bool(DEEPL_AUTH_KEY and DEEPL_AUTH_KEY != "YOUR_DEEPL_API_KEY")
+
+class CircuitBreaker:
+    """Skips a translation provider that keeps failing and probes it again later.
+
+    Closed: every request goes through. After `failure_threshold` consecutive
+    failures it opens and requests are refused; once `reset_timeout` seconds
+    have passed a single probe request is allowed. A success closes the
+    breaker again, a failure re-opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        """True if a request may be sent now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._opened_at is not None
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+        if recovered:
+            log_to_gui(f"{self.name} translator is answering again.")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            tripped = self._opened_at is None and self.failures >= self.failure_threshold
+            if tripped or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+        if tripped:
+            metrics.increment(f"breaker_open_{self.name}")
+            log_to_gui(f"{self.name} translator failed {self.failures} times in a row; "
+                       f"skipping it for {self.reset_timeout}s.")
+
+circuit_breakers = {} # service -> CircuitBreaker
+
+def circuit_breaker(service):
+    breaker = circuit_breakers.get(service)
+    if breaker is None:
+        breaker = circuit_breakers.setdefault(service, CircuitBreaker(service))
+    return breaker
+
+def request_translation(translator_service, texts, target_lang_code):
+    """One provider call for `texts` (a single batched request where supported).
+
+    Returns one translation (or None) per text and reports the outcome to the
+    provider's circuit breaker.
+    """
+    start = time.monotonic()
+    translate_batch = BATCH_TRANSLATORS.get(translator_service)
+    try:
+        if translate_batch and len(texts) > 1:
+            translations = translate_batch(texts, target_lang_code)
+        else:
+            translations = [TRANSLATORS[translator_service](text, target_lang_code) for text in texts]
+    except Exception as e:
+        log_to_gui(f"{translator_service} translation error ({target_lang_code}): {e}")
+        translations = [None] * len(texts)
+    if all(translations):
+        circuit_breaker(translator_service).record_success()
+        metrics.observe(f"provider_{translator_service}", time.monotonic() - start)
+    else:
+        circuit_breaker(translator_service).record_failure()
+    return translations
+
+def hedged_translation(translator_service, texts, target_lang_code, delay=HEDGE_DELAY):
+    """Like request_translation, but falls back to the other providers in HEDGE_PROVIDERS.
+
+    The selected provider is asked first. If it has not answered after `delay`
+    seconds, or fails, the next provider is asked as well and the first
+    complete answer wins; the slower request is left to finish on its own.
+    Providers whose circuit breaker is open are skipped. Returns the
+    translations and, per text, the service that produced it (so it is
+    cached under that service, not the selected one).
+    """
+    candidates = deque([translator_service] + [service for service in HEDGE_PROVIDERS if service != translator_service
+                                                and service in TRANSLATORS and translator_configured(service)])
+    pending = {} # future -> service
+
+    def ask_next():
+        while candidates:
+            service = candidates.popleft()
+            if circuit_breaker(service).allow():
+                pending[hedge_executor.submit(request_translation, service, texts, target_lang_code)] = service
+                return True
+        return False
+
+    if not ask_next():
+        # Every provider is being skipped; rather than drop the caption, try the selected one anyway
+        pending[hedge_executor.submit(request_translation, translator_service, texts, target_lang_code)] = translator_service
+    best = [None] * len(texts)
+    answered_by = [None] * len(texts)
+    while pending:
+        done, _ = wait(pending, timeout=delay if candidates else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            service = pending.pop(future)
+            translations = future.result()
+            if all(translations):
+                if service != translator_service:
+                    metrics.increment("translation_hedge_wins")
+                return translations, [service] * len(texts)
+            for index, translated_text in enumerate(translations):
+                if translated_text and not best[index]:
+                    best[index], answered_by[index] = translated_text, service
+        # Too slow or failed: bring in the next provider
+        if candidates and ask_next():
+            metrics.increment("translation_hedges")
+    return best, answered_by
+
+def translate_phrases(translator_service, texts, source_lang_code, target_lang_codes, cache=True, hedge=False,
+                      processes=None):
+    """Translates every text into every target language at once.
+
+    Cached translations (exact, or near-duplicates from the translation
+    memory) are answered immediately. The remaining requests run
+    concurrently: one batched request per language for services in
+    BATCH_TRANSLATORS, otherwise one request per (text, language). With
+    hedge=True each request goes through hedged_translation; with a
+    WorkerProcessPool in `processes` the requests run there. Returns one
+    {target_lang_code: translation} dict per text; failed targets are missing.
+
+    Provisional (partial) text is passed with cache=False so it does not fill
+    the cache with fragments that will never be spoken again.
+    """
+    results = [{} for _ in texts]
+    missing = {} # target -> indexes of texts still to translate
+    for target in target_lang_codes:
+        for index, text in enumerate(texts):
+            key = TranslationCache.make_key(translator_service, source_lang_code, target, text)
+            cached = get_translation_cache().get(key) if cache else None
+            if cached is None and cache and TRANSLATION_MEMORY:
+                remembered = get_translation_memory().lookup(translator_service, source_lang_code, target, text)
+                if remembered is not None:
+                    cached = remembered[0]
+            if cached is not None:
+                results[index][target] = cached
+            else:
+                missing.setdefault(target, []).append(index)
+    if not missing:
+        return results
+
+    if translator_service not in TRANSLATORS:
+        log_to_gui(f"Unknown translator: {translator_service}")
+        return results
+    if processes is not None:
+        request = lambda service, group_texts, target: processes.translate(service, group_texts, target, hedge)
+    elif hedge:
+        request = hedged_translation
+    else:
+        request = lambda service, group_texts, target: (request_translation(service, group_texts, target),
+                                                        [service] * len(group_texts))
+    jobs = [] # (future, target, indexes)
+    for target, indexes in missing.items():
+        groups = [indexes] if translator_service in BATCH_TRANSLATORS else [[index] for index in indexes]
+        jobs.extend((translation_executor.submit(request, translator_service, [texts[i] for i in group], target), target, group)
+                    for group in groups)
+    for future, target, indexes in jobs:
+        try:
+            translations, services = future.result()
+        except Exception as e:
+            log_to_gui(f"Translation error ({target}): {e}")
+            continue
+        for index, translated_text, service in zip(indexes, translations, services):
+            if not translated_text:
+                continue
+            results[index][target] = translated_text
+            if cache: # Under the service that answered; a backup provider's wording is not the selected one's
+                key = TranslationCache.make_key(service, source_lang_code, target, texts[index])
+                get_translation_cache().put(key, translated_text)
+                if TRANSLATION_MEMORY:
+                    get_translation_memory().add(service, source_lang_code, target, texts[index], translated_text)
+    return results
+
+def caption_for_targets(translations, target_lang_codes):
+    """Caption text for a phrase: a plain string for one target, {lang: text} for several, None if nothing came back."""
+    if len(target_lang_codes) == 1:
+        return translations.get(target_lang_codes[0])
+    return {target: translations[target] for target in target_lang_codes if target in translations} or None
+
+def format_caption_text(text):
+    """Human-readable caption text (multi-language captions as "ar: ... | en: ...")."""
+    if isinstance(text, dict):
+        return " | ".join(f"{target}: {translated}" for target, translated in text.items())
+    return text
+
+# --- Speech Recognition Backends ---
+class RecognizerBackend:
+    """A speech-to-text engine. Subclasses implement `_recognize` and may load models in `warm_up`.
+
+    Like speech_recognition's own recognizers, `recognize` raises
+    sr.UnknownValueError when nothing intelligible was said and
+    sr.RequestError when the engine is unreachable or not installed.
+    """
+
+    name = None
+    offline = False
+
+    def __init__(self):
+        self._latencies = {} # lang_code -> deque of recent recognition times (seconds)
+        self._lock = threading.Lock()
+
+    def recognize(self, recognizer, audio, lang_code):
+        start = time.perf_counter()
+        text = self._recognize(recognizer, audio, lang_code)
+        # Failures are not timed; they would make a broken engine look fast
+        self.record_latency(lang_code, time.perf_counter() - start)
+        return text
+
+    def record_latency(self, lang_code, elapsed):
+        with self._lock:
+            self._latencies.setdefault(lang_code, deque(maxlen=200)).append(elapsed)
+
+    def _recognize(self, recognizer, audio, lang_code):
+        raise NotImplementedError
+
+    def warm_up(self, lang_code):
+        """Loads whatever the engine needs before the first phrase (models, connections)."""
+
+    def latency_stats(self):
+        """Recognition latency per language: {lang_code: {"count", "p50", "p95"}}."""
+        with self._lock:
+            samples = {lang: sorted(values) for lang, values in self._latencies.items()}
+        return {
+            lang: {"count": len(values), "p50": values[len(values) // 2], "p95": values[int(len(values) * 0.95)]}
+            for lang, values in samples.items() if values
+        }
+
+
+class GoogleWebBackend(RecognizerBackend):
+    """Google Web Speech API (requires internet)."""
+
+    name = "Google"
+
+    def _recognize(self, recognizer, audio, lang_code):
+        return recognizer.recognize_google(audio, language=SR_LANG_MAP.get(lang_code, 'en-US'))
+
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx, fully local (only English models ship with pocketsphinx)."""
+
+    name = "Sphinx"
+    offline = True
+
+    def _recognize(self, recognizer, audio, lang_code):
+        return recognizer.recognize_sphinx(audio, language=SR_LANG_MAP.get(lang_code, 'en-US'))
+
+
+class WhisperBackend(RecognizerBackend):
+    """faster-whisper running in-process on the CPU; the model is loaded once and shared."""
+
+    name = "Whisper"
+    offline = True
+
+    def __init__(self, model=WHISPER_MODEL):
+        super().__init__()
+        self.model_name = model
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise sr.RequestError("missing faster-whisper module: ensure that faster-whisper is set up correctly.")
+                self._model = WhisperModel(self.model_name, device="cpu", compute_type="int8")
+            return self._model
+
+    def warm_up(self, lang_code):
+        self._load_model()
+
+    def _recognize(self, recognizer, audio, lang_code):
+        import numpy as np # Installed with faster-whisper
+        model = self._load_model()
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        segments, _ = model.transcribe(samples.astype(np.float32) / 32768.0, language=lang_code, beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class VoskBackend(RecognizerBackend):
+    """Vosk (Kaldi) running in-process; one model per language from VOSK_MODEL_PATHS."""
+
+    name = "Vosk"
+    offline = True
+
+    def __init__(self, model_paths=VOSK_MODEL_PATHS):
+        super().__init__()
+        self.model_paths = model_paths
+        self._models = {}
+        self._model_lock = threading.Lock()
+
+    def _load_model(self, lang_code):
+        with self._model_lock:
+            if lang_code not in self._models:
+                try:
+                    import vosk
+                except ImportError:
+                    raise sr.RequestError("missing vosk module: ensure that vosk is set up correctly.")
+                path = self.model_paths.get(lang_code)
+                if not path or not os.path.isdir(path):
+                    raise sr.RequestError(f"no Vosk model for '{lang_code}' (expected at {path})")
+                vosk.SetLogLevel(-1)
+                self._models[lang_code] = vosk.Model(path)
+            return self._models[lang_code]
+
+    def warm_up(self, lang_code):
+        self._load_model(lang_code)
+
+    def _recognize(self, recognizer, audio, lang_code):
+        model = self._load_model(lang_code)
+        import vosk
+        engine = vosk.KaldiRecognizer(model, 16000)
+        engine.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        text = json.loads(engine.FinalResult()).get("text", "").strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+RECOGNIZER_BACKENDS = {backend.name: backend for backend in (
+    GoogleWebBackend(),
+    WhisperBackend(),
+    VoskBackend(),
+    SphinxBackend(),
+)}
+
+def warm_up_recognizer(backend, lang_code):
+    """Loads the recognizer's model in the background so the first phrase does not pay for it."""
+    def _warm():
+        try:
+            backend.warm_up(lang_code)
+        except Exception as e:
+            log_to_gui(f"{backend.name} recognizer warm-up failed: {e}")
+    threading.Thread(target=_warm, daemon=True).start()
+
+def fastest_recognizer(lang_code):
+    """Name of the backend with the lowest median latency measured so far for `lang_code`, or None."""
+    measured = [(stats[lang_code]["p50"], name) for name, backend in RECOGNIZER_BACKENDS.items()
+                for stats in [backend.latency_stats()] if lang_code in stats]
+    return min(measured)[1] if measured else None
+
+def log_recognizer_latency():
+    """Logs the per-backend, per-language recognition latency collected so far, marking the fastest engine."""
+    measured = {} # lang -> [(name, stats), ...]
+    for name, backend in RECOGNIZER_BACKENDS.items():
+        for lang, stats in backend.latency_stats().items():
+            measured.setdefault(lang, []).append((name, stats))
+    for lang, entries in measured.items():
+        fastest = fastest_recognizer(lang) if len(entries) > 1 else None # Only worth saying when there is a choice
+        for name, stats in entries:
+            log_to_gui(f"Recognizer {name} ({lang}): {stats['count']} phrases, "
+                       f"p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s{' (fastest)' if name == fastest else ''}.")
+
+# --- Worker Processes ---
+# Module settings copied into each worker process (they start from a fresh import of this file)
+PROCESS_SHARED_SETTINGS = ("DEEPL_AUTH_KEY", "DEEPL_LANG_MAP", "SR_LANG_MAP", "HEDGE_PROVIDERS", "HEDGE_DELAY")
+_worker_recognizer = None # sr.Recognizer of a worker process
+
+def _init_worker_process(log_relay, settings):
+    """Runs once in every worker process: log lines go back to the parent, settings match the parent's."""
+    global gui_queue
+    gui_queue = log_relay
+    globals().update(settings)
+
+def _open_shared_block(name):
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13+: the parent owns the block
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _recognize_in_worker(block_name, size, sample_rate, sample_width, backend_name, lang_code):
+    """Worker process side of WorkerProcessPool.recognize."""
+    global _worker_recognizer
+    block = _open_shared_block(block_name)
+    try:
+        frame_data = bytes(block.buf[:size])
+    finally:
+        block.close()
+    if _worker_recognizer is None:
+        _worker_recognizer = sr.Recognizer()
+    audio = sr.AudioData(frame_data, sample_rate, sample_width)
+    return RECOGNIZER_BACKENDS[backend_name]._recognize(_worker_recognizer, audio, lang_code)
+
+def _translate_in_worker(translator_service, texts, target_lang_code, hedge):
+    """Worker process side of WorkerProcessPool.translate."""
+    if hedge:
+        return hedged_translation(translator_service, texts, target_lang_code)
+    return request_translation(translator_service, texts, target_lang_code), [translator_service] * len(texts)
+
+def _warm_up_in_worker(backend_name, lang_code, translator_service, hedge):
+    """Loads the recognizer model and opens translator connections inside a worker process."""
+    RECOGNIZER_BACKENDS[backend_name].warm_up(lang_code)
+    services = [translator_service] + ([service for service in HEDGE_PROVIDERS if service != translator_service] if hedge else [])
+    for service in services:
+        if service in TranslatorClientPool.FACTORIES and translator_configured(service):
+            with translator_pool.client(service) as client:
+                TranslatorClientPool.WARM_UP[service](client)
+
+class WorkerProcessPool:
+    """Runs recognition and translation requests in a pool of worker processes ("processes" execution mode).
+
+    The pipeline threads stay in this process but only wait on the workers,
+    so the Tk mainloop keeps the GIL to itself. Phrase audio is handed over
+    in a shared-memory block (only its name crosses the process boundary);
+    recognized text and translations come back as small results, and log
+    lines written by the workers are relayed to `gui_queue`. Workers are
+    started with "spawn" so they never inherit the GUI's threads.
+    """
+
+    def __init__(self, size=PROCESS_POOL_SIZE):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        context = multiprocessing.get_context("spawn")
+        self.size = size or max(1, (os.cpu_count() or 2) - 1)
+        self._log_relay = context.Queue()
+        settings = {name: globals()[name] for name in PROCESS_SHARED_SETTINGS}
+        self._executor = ProcessPoolExecutor(self.size, mp_context=context, initializer=_init_worker_process,
+                                             initargs=(self._log_relay, settings))
+        threading.Thread(target=self._relay_logs, daemon=True).start()
+
+    def _relay_logs(self):
+        while True:
+            item = self._log_relay.get()
+            if item is None:
+                return
+            gui_queue.put(item)
 
-            except queue.Empty:
-                # No data to send, loop continues
+    def recognize(self, audio, backend_name, lang_code):
+        """Recognizes `audio` in a worker; raises sr.UnknownValueError / sr.RequestError like a backend."""
+        from multiprocessing import shared_memory
+        data = audio.frame_data
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        try:
+            block.buf[:len(data)] = data
+            start = time.perf_counter()
+            text = self._executor.submit(_recognize_in_worker, block.name, len(data), audio.sample_rate,
+                                         audio.sample_width, backend_name, lang_code).result()
+            RECOGNIZER_BACKENDS[backend_name].record_latency(lang_code, time.perf_counter() - start)
+            return text
+        finally:
+            block.close()
+            block.unlink()
+
+    def translate(self, translator_service, texts, target_lang_code, hedge=False):
+        """request_translation (or hedged_translation) run in a worker: (translations, service per text)."""
+        return self._executor.submit(_translate_in_worker, translator_service, list(texts), target_lang_code,
+                                     hedge).result()
+
+    def warm_up(self, settings):
+        """Starts the workers and lets each load models and open connections for `settings`."""
+        def _report(future):
+            if future.exception() is not None:
+                log_to_gui(f"Worker process warm-up failed: {future.exception()}")
+        for _ in range(self.size):
+            self._executor.submit(_warm_up_in_worker, settings.recognizer_backend, settings.lang_code,
+                                  settings.translator_service, settings.hedge).add_done_callback(_report)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._log_relay.put(None)
+
+# --- Wire Format ---
+# Each framed message: 1 byte type, 4 byte big-endian payload length, UTF-8 payload
+FRAME_HEADER = struct.Struct("!BI")
+FRAME_FINAL = 1
+FRAME_PROVISIONAL = 2
+FRAME_FINAL_MULTI = 3 # Payload is a JSON object {"ar": "...", "en": "...", ...}
+FRAME_PROVISIONAL_MULTI = 4
+# "delta" format only: the new caption as an edit of the previous one. Payload: 1 byte frame type of the
+# resulting caption, 4 byte start offset and 4 byte removed length (bytes of the previous payload), then
+# the inserted UTF-8 bytes.
+FRAME_DELTA = 5
+DELTA_HEADER = struct.Struct("!BII")
+FRAME_COMPRESSED = 0x80 # "delta" format only: flag on the type byte, the payload is zlib-compressed
+
+def caption_payload(caption):
+    """Frame type and payload text of a caption."""
+    if isinstance(caption.text, dict):
+        return (FRAME_FINAL_MULTI if caption.final else FRAME_PROVISIONAL_MULTI,
+                json.dumps(caption.text, ensure_ascii=False))
+    return FRAME_FINAL if caption.final else FRAME_PROVISIONAL, caption.text
+
+def encode_caption(caption, wire_format=None):
+    """Encodes one caption for the board (stateless formats; "delta" needs a CaptionEncoder)."""
+    if (wire_format or WIRE_FORMAT) == "raw":
+        text = "\n".join(caption.text.values()) if isinstance(caption.text, dict) else caption.text
+        return text.encode('utf-8')
+    kind, text = caption_payload(caption)
+    payload = text.encode('utf-8')
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+def text_delta(old, new):
+    """The edit turning `old` into `new`: (start byte, removed bytes, inserted bytes), offsets in UTF-8."""
+    prefix = len(os.path.commonprefix([old, new]))
+    longest_suffix = min(len(old), len(new)) - prefix
+    suffix = len(os.path.commonprefix([old[::-1][:longest_suffix], new[::-1][:longest_suffix]]))
+    start = len(old[:prefix].encode('utf-8'))
+    removed = len(old[prefix:len(old) - suffix].encode('utf-8'))
+    return start, removed, new[prefix:len(new) - suffix].encode('utf-8')
+
+class CaptionEncoder:
+    """Encodes captions for one board connection.
+
+    In the "delta" format it remembers what the board shows and sends each
+    update as the changed span only (FRAME_DELTA), unless the full caption is
+    as small. The full caption is sent again after a reconnect (`reset`) and
+    every DELTA_RESYNC_SECONDS, so a board that lost track recovers. Other
+    formats are passed to encode_caption unchanged.
+    """
+
+    def __init__(self, wire_format=None):
+        self.wire_format = wire_format or WIRE_FORMAT
+        self.reset()
+
+    def reset(self):
+        """Forgets the board state; the next caption is sent in full."""
+        self._shown = None # Payload text the board shows
+        self._last_full = 0.0
+
+    def encode(self, caption):
+        if self.wire_format != "delta":
+            return encode_caption(caption, self.wire_format)
+        kind, text = caption_payload(caption)
+        full = text.encode('utf-8')
+        previous, self._shown = self._shown, text
+        now = time.monotonic()
+        if previous is not None and now - self._last_full < DELTA_RESYNC_SECONDS:
+            start, removed, inserted = text_delta(previous, text)
+            delta = DELTA_HEADER.pack(kind, start, removed) + inserted
+            if len(delta) < len(full):
+                metrics.increment("wire_bytes_saved", len(full) - len(delta))
+                return self._frame(FRAME_DELTA, delta)
+        self._last_full = now
+        return self._frame(kind, full)
+
+    @staticmethod
+    def _frame(kind, payload):
+        if len(payload) >= WIRE_COMPRESS_MIN:
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                metrics.increment("wire_bytes_saved", len(payload) - len(compressed))
+                kind, payload = kind | FRAME_COMPRESSED, compressed
+        return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+    def encode_batch(self, captions):
+        return b"".join(self.encode(caption) for caption in captions)
+
+def split_frames(buffer):
+    """Splits complete frames off `buffer`; returns ([(type, payload bytes), ...], remaining bytes)."""
+    frames = []
+    while len(buffer) >= FRAME_HEADER.size:
+        kind, length = FRAME_HEADER.unpack_from(buffer)
+        end = FRAME_HEADER.size + length
+        if len(buffer) < end:
+            break
+        frames.append((kind, bytes(buffer[FRAME_HEADER.size:end])))
+        buffer = buffer[end:]
+    return frames, buffer
+
+class CaptionDecoder:
+    """Board side of the "framed" and "delta" formats (reference for the board firmware).
+
+    `feed` takes bytes as they arrive and returns the completed captions as
+    (frame type, text), with deltas applied and compression undone.
+    """
+
+    def __init__(self):
+        self.buffer = b""
+        self.shown = b"" # Payload of the caption on display
+
+    def feed(self, data):
+        frames, self.buffer = split_frames(self.buffer + data)
+        captions = []
+        for kind, payload in frames:
+            if kind & FRAME_COMPRESSED:
+                kind, payload = kind & ~FRAME_COMPRESSED, zlib.decompress(payload)
+            if kind == FRAME_DELTA:
+                kind, start, removed = DELTA_HEADER.unpack_from(payload)
+                payload = self.shown[:start] + payload[DELTA_HEADER.size:] + self.shown[start + removed:]
+            self.shown = payload
+            captions.append((kind, payload.decode('utf-8')))
+        return captions
+
+def coalesce_captions(captions):
+    """Drops provisional captions that a later caption in the same batch already supersedes."""
+    return [caption for n, caption in enumerate(captions) if caption.final or n == len(captions) - 1]
+
+def take_caption_batch(first, source, max_batch=SEND_BATCH_MAX):
+    """Collects `first` plus whatever else is already queued in `source`, without waiting.
+
+    Returns (captions, stop) where stop is True if the stop sentinel was seen.
+    """
+    batch = [first]
+    while len(batch) < max_batch:
+        try:
+            item = source.get_nowait()
+        except queue.Empty:
+            break
+        source.task_done()
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+# --- Board Connection ---
+class Backoff:
+    """Reconnect delays that double after each failure, up to a maximum, with jitter.
+
+    Half of every delay is random so several clients do not all hit a board
+    the moment it comes back.
+    """
+
+    def __init__(self, base=RECONNECT_DELAY, maximum=RECONNECT_DELAY_MAX):
+        self.base = base
+        self.maximum = maximum
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.base * 2 ** self.attempts)
+        self.attempts += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempts = 0
+
+def configure_board_socket(sock):
+    """Disables Nagle (captions are small) and enables TCP keepalive so a dead board is noticed within seconds."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"): # Linux
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPALIVE_IDLE)
+    elif hasattr(socket, "TCP_KEEPALIVE"): # macOS
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, TCP_KEEPALIVE_IDLE)
+    elif hasattr(socket, "SIO_KEEPALIVE_VALS") and hasattr(sock, "ioctl"): # Windows
+        sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, TCP_KEEPALIVE_IDLE * 1000, TCP_KEEPALIVE_INTERVAL * 1000))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP_KEEPALIVE_INTERVAL)
+    if hasattr(socket, "TCP_KEEPCNT"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, TCP_KEEPALIVE_COUNT)
+    if hasattr(socket, "TCP_USER_TIMEOUT"): # Linux: the same limit for captions the board never acknowledges
+        timeout_ms = (TCP_KEEPALIVE_IDLE + TCP_KEEPALIVE_INTERVAL * TCP_KEEPALIVE_COUNT) * 1000
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, timeout_ms)
+
+# --- Multi-Board Fan-Out ---
+class BoardLink:
+    """One display board in the fan-out transport: its outbox, reconnect state and send statistics."""
+
+    def __init__(self, host, port, outbox_size=BOARD_OUTBOX_SIZE):
+        self.host = host
+        self.port = port
+        self.outbox = asyncio.Queue(outbox_size) # (caption, queued_at)
+        self.unsent = [] # (caption, queued_at) taken from the outbox whose write has not completed
+        self.backoff = Backoff()
+        self.connected = False
+        self.connects = 0
+        self.sent = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=200) # Seconds from queued to written out, recent captions
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+    def offer(self, caption):
+        """Queues a caption; a full outbox drops its oldest caption so a slow board only lags itself."""
+        if self.outbox.full():
+            self.outbox.get_nowait()
+            self.dropped += 1
+        self.outbox.put_nowait((caption, time.monotonic()))
+
+    def keep_newest(self):
+        """Drops everything waiting for this board except the newest caption."""
+        waiting = self.unsent + [self.outbox.get_nowait() for _ in range(self.outbox.qsize())]
+        self.unsent = []
+        if waiting:
+            self.outbox.put_nowait(waiting[-1])
+            self.dropped += len(waiting) - 1
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "queued": self.outbox.qsize() + len(self.unsent),
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max": latencies[-1] if latencies else None,
+        }
+
+
+class AsyncBoardTransport:
+    """Sends every caption from `source` (the CaptionQueue outbox) to N boards at once on one asyncio loop.
+
+    Each board has its own outbox and sender task, so a slow or dead board
+    never holds up the others. While no board is connected captions are left
+    in `source` (the outbox), and its spool is only cleared once a board has
+    written the newest caption taken from it. The transport stops once
+    `stop_event` is set; a None item in `source` wakes the dispatcher so it
+    notices.
+    """
+
+    def __init__(self, boards, source, stop_event, on_status=None, replay=OUTBOX_REPLAY):
+        self.links = [BoardLink(host, port) for host, port in boards]
+        self.source = source
+        self.stop_event = stop_event
+        self.on_status = on_status # Called with True/False when "any board connected" changes
+        self.replay = replay
+        self._any_connected = False
+        self._online = None # asyncio.Event, created on the transport's loop
+        self._last_dispatched = None # Newest caption taken from `source`; the spool goes once a board wrote it
+
+    def run(self):
+        """Runs the transport until `stop_event` is set (blocking; call from a thread)."""
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._online = asyncio.Event()
+        senders = [asyncio.create_task(self._sender(link)) for link in self.links]
+        try:
+            await self._dispatch()
+        finally:
+            for task in senders:
+                task.cancel()
+            await asyncio.gather(*senders, return_exceptions=True)
+            for link in self.links:
+                link.connected = False
+            self._report_status()
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.ensure_future(loop.run_in_executor(None, self.stop_event.wait))
+        while not self.stop_event.is_set():
+            if not self._online.is_set():
+                # No board to deliver to: leave captions in the source queue until one comes back
+                online = asyncio.ensure_future(self._online.wait())
+                await asyncio.wait({online, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                online.cancel()
                 continue
-            except (socket.error, BrokenPipeError, ConnectionResetError) as e:
-                log_to_gui(f"Connection lost: {e}. Reconnecting...")
-                is_connected = False
-                update_gui_connection_status(False)
-                if sock:
-                    sock.close()
-                sock = None # Trigger reconnection attempt in the next loop
+            item = await loop.run_in_executor(None, self.source.get)
+            self.source.task_done()
+            if item is None: # Wake-up; the loop condition decides whether to stop
+                continue
+            if not self._online.is_set():
+                # Every board dropped while we were waiting: keep the caption in the (spooled) outbox
+                self.source.requeue([item])
+                continue
+            for link in self.links:
+                link.offer(item)
+            self._last_dispatched = item
+        await stopping
+
+    @staticmethod
+    async def _watch(reader):
+        """Completes when the board closes the connection or TCP keepalive declares it dead."""
+        while await reader.read(1024):
+            pass # The board has nothing to say; discard anything it sends
+
+    async def _sender(self, link):
+        while True:
+            writer = None
+            watch = None
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(link.host, link.port), timeout=5)
+                sock = writer.get_extra_info("socket")
+                if sock is not None:
+                    configure_board_socket(sock)
+                link.connected = True
+                link.connects += 1
+                link.backoff.reset()
+                encoder = CaptionEncoder() # A new connection starts from a blank board
+                log_to_gui(f"Board {link.name}: connection established.")
+                if self.replay == "newest":
+                    link.keep_newest()
+                self._report_status()
+                watch = asyncio.create_task(self._watch(reader))
+                while True:
+                    if not link.unsent:
+                        get = asyncio.ensure_future(link.outbox.get())
+                        await asyncio.wait({get, watch}, return_when=asyncio.FIRST_COMPLETED)
+                        if not get.done():
+                            get.cancel()
+                            watch.result() # Re-raises a reset/keepalive error
+                            raise ConnectionError("board closed the connection")
+                        link.unsent = [get.result()]
+                        while not link.outbox.empty() and len(link.unsent) < SEND_BATCH_MAX:
+                            link.unsent.append(link.outbox.get_nowait())
+                    batch = link.unsent
+                    captions = coalesce_captions([caption for caption, _ in batch])
+                    for caption in captions:
+                        if caption.timing and "send_start" not in caption.timing.marks:
+                            caption.timing.mark("send_start")
+                    writer.write(encoder.encode_batch(captions))
+                    await writer.drain()
+                    if self.source.empty() and any(caption is self._last_dispatched for caption, _ in batch):
+                        self.source.clear_spool() # A board has everything the spool held
+                    link.unsent = []
+                    now = time.monotonic()
+                    for caption in captions:
+                        if caption.timing and "sent" not in caption.timing.marks: # The first board to get it
+                            caption.timing.mark("sent")
+                            metrics.record_phrase(caption.timing)
+                    link.sent += len(captions)
+                    link.latencies.extend(now - queued_at for _, queued_at in batch)
+                    for _, queued_at in batch:
+                        metrics.observe(f"board_send[{link.name}]", now - queued_at)
+            except asyncio.CancelledError:
+                if watch is not None:
+                    watch.cancel()
+                if writer is not None:
+                    writer.close()
+                raise
+            except (OSError, asyncio.TimeoutError) as e:
+                if watch is not None:
+                    watch.cancel()
+                if writer is not None:
+                    writer.close()
+                if link.connected:
+                    # Reconnect straight away; the backoff only starts if that fails too
+                    log_to_gui(f"Board {link.name}: connection lost: {e}. Reconnecting...")
+                    link.connected = False
+                    self._report_status()
+                    continue
+                delay = link.backoff.next_delay()
+                log_to_gui(f"Board {link.name}: connection failed: {e}. Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+    def _report_status(self):
+        any_connected = any(link.connected for link in self.links)
+        if any_connected:
+            self._online.set()
+        else:
+            self._online.clear()
+        if any_connected != self._any_connected:
+            self._any_connected = any_connected
+            if self.on_status:
+                self.on_status(any_connected)
+
+    def stats(self):
+        """Per-board statistics keyed by "host:port"."""
+        return {link.name: link.stats() for link in self.links}
+
+
+# --- Voice Activity Detection ---
+def split_speech(audio, energy_threshold, frame_ms=VAD_FRAME_MS, min_speech=VAD_MIN_SPEECH_SECONDS,
+                 padding=VAD_PADDING_SECONDS, split_after=VAD_SPLIT_SECONDS, split_pause=VAD_SPLIT_PAUSE_SECONDS):
+    """Cuts a captured phrase down to the parts worth sending to the recognizer.
+
+    Frames whose RMS energy (the measure speech_recognition uses for
+    `energy_threshold`) is above the threshold count as speech. Leading and
+    trailing silence is trimmed, phrases longer than `split_after` seconds
+    are split at pauses of at least `split_pause` seconds, and pieces with
+    less than `min_speech` seconds of speech are dropped. Returns a list of
+    sr.AudioData, empty when the phrase holds no speech; without numpy (or
+    for 24-bit audio) the phrase is returned unchanged.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [audio]
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}.get(audio.sample_width)
+    if dtype is None:
+        return [audio]
+    frame = max(1, int(audio.sample_rate * frame_ms / 1000))
+    samples = np.frombuffer(audio.frame_data, dtype=dtype)
+    frame_count = len(samples) // frame
+    if frame_count == 0:
+        return []
+    frames = samples[:frame_count * frame].reshape(frame_count, frame).astype(np.float64)
+    voiced = np.flatnonzero(np.sqrt(np.mean(frames * frames, axis=1)) > energy_threshold)
+
+    frame_seconds = frame / audio.sample_rate
+    min_voiced = math.ceil(min_speech / frame_seconds)
+    if len(voiced) < min_voiced:
+        return []
+    if split_after and (voiced[-1] - voiced[0] + 1) * frame_seconds > split_after:
+        # A gap between two voiced frames of at least `split_pause` ends one piece and starts the next
+        breaks = np.flatnonzero(np.diff(voiced) > math.ceil(split_pause / frame_seconds)) + 1
+        pieces = np.split(voiced, breaks)
+    else:
+        pieces = [voiced]
+
+    pad = int(padding / frame_seconds)
+    bytes_per_frame = frame * audio.sample_width
+    segments = []
+    for piece in pieces:
+        if len(piece) < min_voiced:
+            continue
+        start = max(0, piece[0] - pad)
+        end = min(frame_count, piece[-1] + 1 + pad)
+        segments.append(sr.AudioData(audio.frame_data[start * bytes_per_frame:end * bytes_per_frame],
+                                     audio.sample_rate, audio.sample_width))
+    return segments
+
+def audio_seconds(audio):
+    return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+def vad_segments(audio, energy_threshold):
+    """split_speech plus metrics and logging; returns the pieces to recognize (possibly none)."""
+    start = time.monotonic()
+    segments = split_speech(audio, energy_threshold)
+    metrics.observe("vad", time.monotonic() - start)
+    kept = sum(audio_seconds(segment) for segment in segments)
+    metrics.increment("vad_seconds_trimmed", round(audio_seconds(audio) - kept, 3))
+    if not segments:
+        metrics.increment("vad_phrases_dropped")
+        log_to_gui("No speech in captured audio; skipped.")
+    elif len(segments) > 1:
+        log_to_gui(f"Long phrase split into {len(segments)} parts at pauses.")
+    return segments
+
+# --- Phrase Pipeline ---
+class StageQueue(queue.Queue):
+    """Bounded queue between two pipeline stages with a configurable overload policy."""
+
+    def __init__(self, maxsize=STAGE_QUEUE_SIZE, policy=OVERLOAD_POLICY):
+        if policy not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overload policy: {policy}")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def offer(self, item):
+        """Adds `item` and returns the item dropped to make room (None if nothing was dropped)."""
+        if self.policy == "block":
+            self.put(item)
+            return None
+        with self.mutex:
+            dropped = None
+            if 0 < self.maxsize <= self._qsize():
+                self.dropped += 1
+                if self.policy == "drop_newest":
+                    return item
+                # Oldest phrase goes; control items (stop sentinels) are never dropped
+                dropped = next((queued for queued in self.queue if queued is not None), None)
+                if dropped is None:
+                    return item
+                self.queue.remove(dropped)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+            return dropped
+
+    def put_control(self, item):
+        """Adds a control item (e.g. a stop sentinel) regardless of the size limit."""
+        with self.mutex:
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class PhraseSequencer:
+    """Releases pipeline results in spoken order even though stages finish out of order."""
+
+    def __init__(self, sink, hold_timeout=SEQUENCE_HOLD_TIMEOUT):
+        self.sink = sink # Called with each result, in sequence order
+        self.hold_timeout = hold_timeout
+        self._next_seq = 0
+        self._issued = 0
+        self._ready = {} # seq -> (result, finished_at)
+        self._lock = threading.Lock()
+
+    def next_seq(self):
+        """Issues the sequence number for a newly captured phrase."""
+        with self._lock:
+            seq = self._issued
+            self._issued += 1
+            return seq
+
+    def is_released(self, seq):
+        """True once the final result for `seq` has been delivered (or given up on)."""
+        with self._lock:
+            return seq < self._next_seq
+
+    def is_current(self, seq):
+        """True when every phrase before `seq` has been delivered, i.e. `seq` is next on the board."""
+        with self._lock:
+            return seq == self._next_seq
+
+    def complete(self, seq, result):
+        """Records the result for `seq` (None = nothing to send) and flushes everything now in order."""
+        released = []
+        with self._lock:
+            if seq < self._next_seq: # Arrived after we gave up waiting for it
+                return
+            self._ready[seq] = (result, time.monotonic())
+            # Do not let one stuck phrase hold back everything spoken after it
+            if self._next_seq not in self._ready and self._ready:
+                oldest = min(self._ready.values(), key=lambda entry: entry[1])[1]
+                if time.monotonic() - oldest > self.hold_timeout:
+                    self._next_seq = min(self._ready)
+            while self._next_seq in self._ready:
+                result, _ = self._ready.pop(self._next_seq)
+                self._next_seq += 1
+                if result is not None:
+                    released.append(result)
+        for result in released: # Deliver outside the lock; sinks may block
+            self.sink(result)
+
+
+class PhrasePipeline:
+    """Capture -> recognition workers -> translation workers -> network, in spoken order.
+
+    `audio_callback` only stamps each phrase with a sequence number and hands
+    it off, so the listener thread is never blocked by network round trips.
+    Each phrase also takes a snapshot of `settings()` when it is captured;
+    both stages are called with that snapshot, so changing settings never
+    affects a phrase that is already in the pipeline.
+    """
+
+    def __init__(self, recognize, translate, sink, settings=lambda: None,
+                 recognition_workers=RECOGNITION_WORKERS, translation_workers=TRANSLATION_WORKERS,
+                 queue_size=STAGE_QUEUE_SIZE, policy=OVERLOAD_POLICY, translation_batch=TRANSLATION_BATCH_MAX):
+        self.recognize = recognize # (audio, settings) -> text (raises sr.UnknownValueError / sr.RequestError)
+        self.translate = translate # ([text, ...], settings) -> [caption text or None, ...] (one provider round trip if possible)
+        self.settings = settings # Returns the settings a newly captured phrase is processed with
+        self.translation_batch = translation_batch
+        self.sequencer = PhraseSequencer(sink)
+        self.recognition_queue = StageQueue(queue_size, policy)
+        self.translation_queue = StageQueue(queue_size, policy)
+        self._threads = []
+        for n in range(recognition_workers):
+            self._threads.append(threading.Thread(target=self._recognition_worker, name=f"recognition-{n}", daemon=True))
+        for n in range(translation_workers):
+            self._threads.append(threading.Thread(target=self._translation_worker, name=f"translation-{n}", daemon=True))
+        self._recognition_workers = recognition_workers
+        self._translation_workers = translation_workers
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Tells every worker to exit once it finishes its current phrase."""
+        for _ in range(self._recognition_workers):
+            self.recognition_queue.put_control(None)
+        for _ in range(self._translation_workers):
+            self.translation_queue.put_control(None)
+
+    def submit(self, audio, seq=None):
+        """Capture stage: queue a phrase for recognition (streaming mode passes the seq it already issued)."""
+        timing = PhraseTiming() # Captured = end of speech
+        if seq is None:
+            seq = self.sequencer.next_seq()
+        self._offer(self.recognition_queue, (seq, audio, timing, self.settings()), "recognition")
+
+    def _offer(self, stage_queue, item, stage_name):
+        dropped = stage_queue.offer(item)
+        if dropped is not None:
+            log_to_gui(f"Warning: {stage_name} queue full, dropped phrase #{dropped[0]}.")
+            metrics.increment("phrases_dropped")
+            self.sequencer.complete(dropped[0], None) # Release the slot so later phrases are not held back
+
+    def _recognition_worker(self):
+        while True:
+            item = self.recognition_queue.get()
+            if item is None:
+                break
+            seq, audio, timing, settings = item
+            timing.mark("recognition_start")
+            spoken_text = None
+            try:
+                spoken_text = self.recognize(audio, settings)
+                timing.mark("recognized")
+                log_to_gui(f"Recognized: {spoken_text}")
+            except sr.UnknownValueError:
+                log_to_gui("Could not understand audio")
+            except sr.RequestError as e:
+                log_to_gui(f"Could not request results from speech recognition service; {e}")
             except Exception as e:
-                 log_to_gui(f"Network sending error: {e}")
-                 # Decide if this error warrants disconnection
-                 is_connected = False
-                 update_gui_connection_status(False)
-                 if sock:
-                     sock.close()
-                 sock = None
-
-        # Small delay if not connected to prevent busy-waiting
-        if not is_connected:
-            time.sleep(0.1)
-
-
-    # Cleanup on exit
-    if sock:
-        sock.close()
-    is_connected = False
-    log_to_gui("Network thread stopped.")
-    update_gui_connection_status(False)
-
-
-# --- Speech Recognition Handling ---
-def speech_recognition_manager(lang_code, translator_service, target_lang_code):
-    """Manages microphone listening and speech-to-text conversion."""
-    global is_listening, stop_mic_listening, app_running
-
-    recognizer = sr.Recognizer()
-    # Adjust sensitivity based on environment if needed
-    # recognizer.energy_threshold = 4000
-    # recognizer.dynamic_energy_threshold = True
-    # recognizer.pause_threshold = 0.8 # Seconds of non-speaking audio before phrase is considered complete
-
-    microphone = sr.Microphone()
+                log_to_gui(f"Error during audio processing: {e}")
+            if spoken_text:
+                self._offer(self.translation_queue, (seq, spoken_text, timing, settings), "translation")
+            else:
+                metrics.increment("recognition_failures")
+                self.sequencer.complete(seq, None)
+
+    def _translation_worker(self):
+        stopping = False
+        while not stopping:
+            item = self.translation_queue.get()
+            if item is None:
+                break
+            # Phrases that piled up meanwhile share one provider request
+            batch = [item]
+            while len(batch) < self.translation_batch:
+                try:
+                    item = self.translation_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Only phrases captured with the same settings can share a request
+            groups = []
+            for item in batch:
+                group = next((group for group in groups if group[0][3] == item[3]), None)
+                if group is None:
+                    groups.append([item])
+                else:
+                    group.append(item)
+            for group in groups:
+                self._translate_batch(group)
+
+    def _translate_batch(self, batch):
+        """Translates phrases that share their settings snapshot in one call and releases their captions."""
+        for _, _, timing, _ in batch:
+            timing.mark("translation_start")
+        try:
+            translations = self.translate([spoken_text for _, spoken_text, _, _ in batch], batch[0][3])
+        except Exception as e:
+            log_to_gui(f"Error during translation: {e}")
+            translations = [None] * len(batch)
+        for (seq, _, timing, _), translated_text in zip(batch, translations):
+            timing.mark("translated")
+            if not translated_text:
+                log_to_gui("Translation failed.")
+                metrics.increment("translation_failures")
+            self.sequencer.complete(seq, Caption(seq, translated_text, True, timing) if translated_text else None)
+
+
+# --- Streaming (Provisional Captions) ---
+def merge_partial_transcript(previous, new):
+    """Stitches the transcript of an overlapping window onto the text recognized so far."""
+    old_words, new_words = previous.split(), new.split()
+    old_lower = [word.lower() for word in old_words]
+    new_lower = [word.lower() for word in new_words]
+    for overlap in range(min(len(old_words), len(new_words)), 0, -1):
+        if old_lower[-overlap:] == new_lower[:overlap]:
+            return " ".join(old_words + new_words[overlap:])
+    return " ".join(old_words + new_words)
+
+
+class PartialCaptioner:
+    """Recognizes and translates overlapping windows of a phrase that is still being spoken.
+
+    Only the newest window matters, so the work queue holds a single item and
+    older windows are dropped. Provisional captions for a phrase stop as soon
+    as its final caption has been released.
+    """
+
+    def __init__(self, recognize, translate, sink, sequencer, settings=lambda: None):
+        self.recognize = recognize # (audio, settings) -> text
+        self.translate = translate # (text, settings) -> caption text or None
+        self.sink = sink
+        self.sequencer = sequencer
+        self.settings = settings # Snapshot taken for each window, as PhrasePipeline does for each phrase
+        self.windows = StageQueue(1, "drop_oldest")
+        self._transcripts = {} # seq -> provisional text so far
+        self._finished_seq = -1 # Highest phrase that has ended; its windows are no longer transcribed
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name="partial", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.windows.put_control(None)
+
+    def submit_window(self, seq, audio, from_phrase_start):
+        self.windows.offer((seq, audio, from_phrase_start, self.settings()))
+
+    def finish(self, seq):
+        """Forgets the provisional text of a phrase once it has ended."""
+        with self._lock:
+            self._finished_seq = max(self._finished_seq, seq)
+            self._transcripts.pop(seq, None)
+
+    def _worker(self):
+        while True:
+            item = self.windows.get()
+            if item is None:
+                break
+            seq, audio, from_phrase_start, settings = item
+            if self.sequencer.is_released(seq):
+                continue
+            try:
+                window_text = self.recognize(audio, settings)
+            except Exception: # Unclear fragments are normal mid-phrase; the final pass reports errors
+                continue
+            with self._lock:
+                if seq <= self._finished_seq: # The phrase ended while this window was being recognized
+                    continue
+                if not from_phrase_start and seq in self._transcripts:
+                    window_text = merge_partial_transcript(self._transcripts[seq], window_text)
+                self._transcripts[seq] = window_text
+            try:
+                translated_text = self.translate(window_text, settings)
+            except Exception:
+                continue
+            # Never show a phrase before the final caption of the one spoken before it
+            if translated_text and self.sequencer.is_current(seq):
+                self.sink(Caption(seq, translated_text, False))
+
+
+def listen_streaming_in_background(recognizer, source, on_phrase_start, on_window, on_phrase,
+                                   window_seconds=STREAM_WINDOW_SECONDS, hop_seconds=STREAM_HOP_SECONDS,
+                                   phrase_time_limit=PHRASE_TIME_LIMIT):
+    """Like `recognizer.listen_in_background`, but also reports overlapping windows while a phrase is spoken.
+
+    `on_phrase_start()` returns an id for the new phrase, `on_window(id, audio,
+    from_phrase_start)` receives the latest `window_seconds` every
+    `hop_seconds` of speech and `on_phrase(id, audio)` the whole phrase once it
+    ends (audio is None when it was too short to be speech). Returns a stopper
+    function like `listen_in_background` does.
+    """
+    running = [True]
+
+    def threaded_listen():
+        with source as s:
+            seconds_per_buffer = float(s.CHUNK) / s.SAMPLE_RATE
+            pause_buffer_count = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+            phrase_buffer_count = int(math.ceil(recognizer.phrase_threshold / seconds_per_buffer))
+            non_speaking_buffer_count = int(math.ceil(recognizer.non_speaking_duration / seconds_per_buffer))
+            window_buffer_count = max(1, int(math.ceil(window_seconds / seconds_per_buffer)))
+            hop_buffer_count = max(1, int(math.ceil(hop_seconds / seconds_per_buffer)))
+            limit_buffer_count = int(math.ceil(phrase_time_limit / seconds_per_buffer)) if phrase_time_limit else None
+
+            def audio_of(frames):
+                return sr.AudioData(b"".join(frames), s.SAMPLE_RATE, s.SAMPLE_WIDTH)
+
+            preroll = deque(maxlen=max(1, non_speaking_buffer_count))
+            frames = None # Frames of the phrase in progress (None while waiting for speech)
+            while running[0]:
+                buffer = s.stream.read(s.CHUNK)
+                if len(buffer) == 0: # Reached end of the stream
+                    break
+                energy = audioop.rms(buffer, s.SAMPLE_WIDTH)
+
+                if frames is None:
+                    preroll.append(buffer)
+                    if energy > recognizer.energy_threshold: # Speech started
+                        frames = list(preroll)
+                        preroll.clear()
+                        phrase_id = on_phrase_start()
+                        pause_count = speaking_count = new_since_window = 0
+                    elif recognizer.dynamic_energy_threshold:
+                        # Same asymmetric weighted average speech_recognition uses between phrases
+                        damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_buffer
+                        target_energy = energy * recognizer.dynamic_energy_ratio
+                        recognizer.energy_threshold = recognizer.energy_threshold * damping + target_energy * (1 - damping)
+                    continue
+
+                frames.append(buffer)
+                new_since_window += 1
+                if energy > recognizer.energy_threshold:
+                    pause_count = 0
+                    speaking_count += 1
+                else:
+                    pause_count += 1
+
+                too_long = limit_buffer_count and len(frames) >= limit_buffer_count
+                if pause_count > pause_buffer_count or too_long: # End of the phrase
+                    for _ in range(max(0, pause_count - non_speaking_buffer_count)):
+                        frames.pop() # Remove extra non-speaking frames at the end
+                    on_phrase(phrase_id, audio_of(frames) if speaking_count >= phrase_buffer_count else None)
+                    frames = None
+                elif new_since_window >= hop_buffer_count and pause_count == 0:
+                    new_since_window = 0
+                    on_window(phrase_id, audio_of(frames[-window_buffer_count:]), len(frames) <= window_buffer_count)
+
+            if frames is not None: # Stream ended mid-phrase
+                on_phrase(phrase_id, audio_of(frames) if speaking_count >= phrase_buffer_count else None)
+
+    def stopper(wait_for_stop=True):
+        running[0] = False
+        if wait_for_stop:
+            listener_thread.join()
+
+    listener_thread = threading.Thread(target=threaded_listen, daemon=True)
+    listener_thread.start()
+    return stopper
+
+
+# --- Microphone Calibration ---
+class CalibrationCache:
+    """Ambient-noise energy thresholds per input device, kept in a small JSON file.
+
+    Starting to listen with a remembered threshold skips the blocking
+    one-second calibration; while listening, the threshold adapted by
+    speech_recognition (dynamic_energy_threshold) is saved back periodically,
+    so the stored value keeps following the room.
+    """
+
+    def __init__(self, path=CALIBRATION_CACHE_PATH, max_age=CALIBRATION_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._entries = {} # device key -> {"energy_threshold": float, "measured_at": epoch seconds}
+        self._lock = threading.Lock()
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                log_to_gui(f"Calibration cache ignored: {e}")
+
+    @staticmethod
+    def device_key(microphone):
+        """Identifies an input device: the source class plus its PyAudio device index (None = system default)."""
+        index = getattr(microphone, "device_index", None)
+        return f"{type(microphone).__name__}:{'default' if index is None else index}"
+
+    def get(self, key):
+        """Returns the remembered threshold for `key`, or None when missing or too old."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.time() - entry["measured_at"] <= self.max_age:
+            return entry["energy_threshold"]
+        return None
 
-    # Adjust for ambient noise once when starting
-    try:
-        with microphone as source:
-            log_to_gui("Adjusting for ambient noise... Please wait.")
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            log_to_gui("Ambient noise adjustment complete. Ready to listen.")
-    except Exception as e:
-        log_to_gui(f"Microphone Error: {e}. Cannot start listening.")
-        is_listening = False
+    def put(self, key, energy_threshold):
+        with self._lock:
+            self._entries[key] = {"energy_threshold": round(energy_threshold, 2), "measured_at": time.time()}
+            entries = dict(self._entries)
+        if self.path:
+            try:
+                with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=1)
+                os.replace(self.path + ".tmp", self.path)
+            except OSError as e:
+                log_to_gui(f"Could not save calibration: {e}")
+
+calibration_cache = None # CalibrationCache, see get_calibration_cache()
+
+def get_calibration_cache():
+    """The shared CalibrationCache, read from disk on first use."""
+    global calibration_cache
+    with _shared_cache_lock:
+        if calibration_cache is None:
+            calibration_cache = CalibrationCache()
+        return calibration_cache
+
+# Settings of a running listener. PipelineCore.apply_settings swaps in a new
+# one; PhrasePipeline.submit takes the current one for each phrase and it is
+# carried through every stage, so a change never mixes settings in a phrase.
+ListenerSettings = namedtuple("ListenerSettings", "lang_code translator_service target_lang_codes recognizer_backend hedge")
+
+def warm_up_translators(translator_service, hedge):
+    """Opens translator connections in the background (the backup providers too when hedging)."""
+    services = [translator_service] + ([service for service in HEDGE_PROVIDERS if service != translator_service] if hedge else [])
+    for service in services:
+        if service in TranslatorClientPool.FACTORIES and translator_configured(service):
+            translator_pool.warm_up(service)
+
+
+# --- Pipeline Core ---
+class PipelineCore:
+    """GUI-free owner of the board connection, the microphone and the phrase pipeline.
+
+    The Tk app and the headless command line both drive one of these. Status
+    changes and log lines are reported through `log_to_gui` and friends, so a
+    front end only has to drain `gui_queue`.
+    """
+
+    def __init__(self, boards=None, microphone_factory=None, execution_mode=EXECUTION_MODE, process_pool_size=PROCESS_POOL_SIZE):
+        self.boards = boards or BOARDS
+        self.microphone_factory = microphone_factory # Returns an sr.AudioSource; defaults to sr.Microphone
+        self.execution_mode = execution_mode
+        self.process_pool_size = process_pool_size
+        self.worker_processes = None # WorkerProcessPool, started with the first listener in "processes" mode
+        self.network_queue = CaptionQueue() # Queue to send data to network thread safely; the outbox while offline
+        self.running = True # Flag to signal threads to stop
+        self.connected = False
+        self.listening = False
+        self.network_stop = threading.Event() # Set to make the network thread exit
+        self.listen_stop = threading.Event() # Set to make the microphone thread exit
+        self.settings = None # ListenerSettings of the running listener
+        self.streaming = False # Whether the running listener sends provisional captions
+        self.connection_thread = None
+        self.mic_thread = None
+        self.stop_mic_listening = None # Function to stop background listener
+        metrics.set_gauge("network_queue_depth", self.network_queue.qsize)
+        metrics.set_gauge("network_queue_dropped", lambda: self.network_queue.dropped)
+
+    # --- Control ---
+    def network_active(self):
+        """True while the network thread runs and has not been asked to stop (connected or reconnecting)."""
+        return bool(self.connection_thread and self.connection_thread.is_alive() and not self.network_stop.is_set())
+
+    def connect(self):
+        """Starts the network thread for the configured board(s).
+
+        Returns False while a network thread is still alive: it is either
+        (re)connecting on its own already or finishing a disconnect.
+        """
+        if self.connection_thread and self.connection_thread.is_alive():
+            return False
+        self.running = True
+        self.network_stop.clear()
+        if len(self.boards) > 1:
+            self.connection_thread = threading.Thread(target=self.board_fanout_manager, args=(self.boards,), daemon=True)
+        else:
+            self.connection_thread = threading.Thread(target=self.network_manager, args=self.boards[0], daemon=True)
+        self.connection_thread.start()
+        return True
+
+    def disconnect(self):
+        """Asks the network thread to finish; it reports the new status itself."""
+        if self.connection_thread and self.connection_thread.is_alive():
+            log_to_gui("Disconnecting...")
+            self.network_stop.set()
+            self.network_queue.put(None) # Wake the thread if it is waiting on the queue
+        self.connected = False
+
+    def start_listening(self, lang_code, translator_service, target_lang_codes,
+                        streaming=STREAMING_MODE, recognizer_backend=RECOGNIZER_BACKEND, hedge=HEDGE_TRANSLATION):
+        """Starts the microphone thread; returns False when there is no board connection.
+
+        While the network thread is reconnecting, captions wait in the outbox,
+        so listening may start (or carry on) then as well. `target_lang_codes`
+        is one language code or a list of them; with several, each phrase is
+        sent to the board as one multi-language caption. With `hedge`, slow or
+        failing translations are retried on the other provider.
+        """
+        if not (self.connected or self.network_active()):
+            return False
+        if isinstance(target_lang_codes, str):
+            target_lang_codes = [target_lang_codes]
+        self.settings = ListenerSettings(lang_code, translator_service, list(target_lang_codes), recognizer_backend, hedge)
+        self.streaming = streaming
+        if self.execution_mode == "processes" and self.worker_processes is None:
+            self.worker_processes = WorkerProcessPool(self.process_pool_size)
+            log_to_gui(f"Recognition and translation run in {self.worker_processes.size} worker processes.")
+        self.listening = True
+        self.listen_stop.clear()
+        update_gui_mic_status(True)
+        self.mic_thread = threading.Thread(target=self.speech_recognition_manager, daemon=True)
+        self.mic_thread.start()
+        return True
+
+    def apply_settings(self, lang_code, translator_service, target_lang_codes,
+                       recognizer_backend=RECOGNIZER_BACKEND, hedge=HEDGE_TRANSLATION):
+        """Switches the running listener to new settings without reopening the microphone.
+
+        The next phrase is recognized and translated with them; phrases
+        already in the pipeline finish with the settings they were captured with.
+        """
+        if isinstance(target_lang_codes, str):
+            target_lang_codes = [target_lang_codes]
+        old = self.settings
+        self.settings = ListenerSettings(lang_code, translator_service, list(target_lang_codes), recognizer_backend, hedge)
+        if self.worker_processes is not None:
+            if old != self.settings:
+                self.worker_processes.warm_up(self.settings)
+        else:
+            if old is None or (old.lang_code, old.recognizer_backend) != (lang_code, recognizer_backend):
+                warm_up_recognizer(RECOGNIZER_BACKENDS[recognizer_backend], lang_code)
+            if old is None or (old.translator_service, old.hedge) != (translator_service, hedge):
+                warm_up_translators(translator_service, hedge)
+        log_to_gui(f"Settings applied: {lang_code} -> {', '.join(target_lang_codes)} via {translator_service} "
+                   f"(speech: {recognizer_backend}).")
+
+    def stop_listening(self):
+        """Stops the microphone listener and waits briefly for its thread."""
+        self.listening = False # Signal the thread/callback to stop processing
+        self.listen_stop.set()
         update_gui_mic_status(False)
-        return
-
-    def audio_callback(recognizer, audio):
-        """Callback function executed when speech is detected."""
-        global is_listening
-        if not is_listening or not app_running: # Check if we should still be processing
-             return
+        if self.stop_mic_listening:
+            log_to_gui("Requesting microphone stop...")
+            self.stop_mic_listening(wait_for_stop=False)
+            self.stop_mic_listening = None
+        if self.mic_thread and self.mic_thread.is_alive():
+            self.mic_thread.join(timeout=1.0) # Wait briefly for thread to potentially exit
+            if self.mic_thread.is_alive():
+                log_to_gui("Warning: Mic thread did not stop cleanly.")
+
+    def shutdown(self):
+        """Stops every thread and releases translator connections and the cache."""
+        self.running = False
+        self.listen_stop.set()
+        self.network_stop.set()
+        if self.listening:
+            self.listening = False
+            if self.stop_mic_listening:
+                self.stop_mic_listening(wait_for_stop=False)
+        if self.connection_thread and self.connection_thread.is_alive():
+            self.network_queue.put(None) # Wake the network thread
+        translator_pool.close() # Drop kept-alive translator connections
+        if translation_cache is not None:
+            translation_cache.close()
+        if self.worker_processes is not None:
+            self.worker_processes.shutdown()
+            self.worker_processes = None
+
+    # --- Network Handling ---
+    def network_manager(self, host, port):
+        """Manages the TCP connection, reconnection, and sending data.
+
+        Captions wait in `network_queue` while the board is offline and are
+        replayed (all, or only the newest) once it is back. Nothing here polls:
+        the thread blocks on the queue, and None items wake it up to check
+        `network_stop` or a link loss reported by the socket watcher.
+        """
+        sock = None
+        backoff = Backoff()
+        link_lost = None
+
+        while not self.network_stop.is_set():
+            if sock is None: # Try to connect if not connected
+                self.connected = False
+                log_to_gui(f"Attempting to connect to {host}:{port}...")
+                try:
+                    sock = socket.create_connection((host, port), timeout=5) # Connection timeout
+                    configure_board_socket(sock)
+                    sock.settimeout(None) # Reset timeout after connection
+                except OSError as e:
+                    sock = None # Ensure socket is None if connection failed
+                    delay = backoff.next_delay()
+                    log_to_gui(f"Connection failed: {e}. Retrying in {delay:.1f}s...")
+                    update_gui_connection_status(False)
+                    self.network_stop.wait(delay) # Returns early when the app stops
+                    continue # Retry connection
+                backoff.reset()
+                encoder = CaptionEncoder() # A new connection starts from a blank board
+                link_lost = threading.Event()
+                threading.Thread(target=self._watch_board_socket, args=(sock, link_lost), daemon=True).start()
+                self.connected = True
+                log_to_gui("Connection established.")
+                update_gui_connection_status(True)
+                self._replay_outbox()
 
-        log_to_gui("Processing audio...")
+            batch = []
+            try:
+                item = self.network_queue.get()
+                self.network_queue.task_done() # Mark task as completed
+                if item is not None:
+                    # Whatever queued up meanwhile goes out in the same write
+                    batch, _ = take_caption_batch(item, self.network_queue)
+                    batch = coalesce_captions(batch)
+                    for caption in batch:
+                        log_to_gui(f"Sending: {format_caption_text(caption.text)}")
+                        if caption.timing:
+                            caption.timing.mark("send_start")
+                    sock.sendall(encoder.encode_batch(batch))
+                    for caption in batch:
+                        if caption.timing:
+                            caption.timing.mark("sent")
+                            metrics.record_phrase(caption.timing)
+                    batch = []
+                    if self.network_queue.empty():
+                        self.network_queue.clear_spool()
+                if link_lost.is_set():
+                    raise ConnectionError("the board stopped answering")
+
+            except OSError as e:
+                if not self.network_stop.is_set():
+                    log_to_gui(f"Connection lost: {e}. Reconnecting...")
+            except Exception as e:
+                log_to_gui(f"Network sending error: {e}")
+            else:
+                continue
+            # The link is gone: keep what was not sent and reconnect right away
+            self.connected = False
+            self.network_queue.requeue(batch)
+            self.network_queue.set_offline(True)
+            update_gui_connection_status(False)
+            sock.close()
+            sock = None
+
+        # Cleanup on exit
+        if sock:
+            sock.close()
+        self.connected = False
+        self.network_queue.set_offline(True)
+        log_to_gui("Network thread stopped.")
+        update_gui_connection_status(False)
+
+    def _watch_board_socket(self, sock, link_lost):
+        """Blocks reading the board socket; EOF or an error (e.g. a keepalive timeout) means the link is gone."""
         try:
-            # Recognize speech using Google Web Speech API (requires internet)
-            # Use the language code selected in the GUI for recognition
-            spoken_text = recognizer.recognize_google(audio, language=SR_LANG_MAP.get(lang_code, 'en-US'))
-            log_to_gui(f"Recognized: {spoken_text}")
-
-            # Translate the text
-            translated_text = None
-            if translator_service == "Google":
-                translated_text = translate_text_google(spoken_text, target_lang_code)
-            elif translator_service == "DeepL":
-                 translated_text = translate_text_deepl(spoken_text, target_lang_code)
-
-            if translated_text:
-                log_to_gui(f"Translated ({target_lang_code}): {translated_text}")
-                # Send translated text to the network thread via queue
-                if is_connected:
-                    network_queue.put(translated_text)
-                else:
-                    log_to_gui("Warning: Not connected. Translation not sent.")
+            while sock.recv(1024):
+                pass # The board has nothing to say; discard anything it sends
+        except OSError:
+            pass
+        link_lost.set()
+        self.network_queue.put(None) # Wake the network thread
+
+    def _replay_outbox(self):
+        """Sends what was queued while the board was offline (or only the newest caption)."""
+        if OUTBOX_REPLAY == "newest":
+            dropped = self.network_queue.keep_newest()
+            if dropped:
+                log_to_gui(f"Skipped {dropped} captions queued while offline; sending only the newest.")
+        self.network_queue.set_offline(False)
+        pending = sum(1 for caption in list(self.network_queue.queue) if caption is not None)
+        if pending:
+            log_to_gui(f"Replaying {pending} captions queued while offline.")
+
+    def board_fanout_manager(self, boards):
+        """Network thread for several boards: runs the asyncio fan-out transport."""
+        def on_status(connected):
+            self.connected = connected
+            if connected:
+                self._replay_outbox()
             else:
-                 log_to_gui("Translation failed.")
-
-        except sr.UnknownValueError:
-            log_to_gui("Could not understand audio")
-        except sr.RequestError as e:
-            log_to_gui(f"Could not request results from Google Speech Recognition service; {e}")
+                self.network_queue.set_offline(True)
+            update_gui_connection_status(connected)
+
+        log_to_gui(f"Connecting to {len(boards)} boards...")
+        transport = AsyncBoardTransport(boards, self.network_queue, self.network_stop, on_status=on_status)
+        transport.run()
+        for name, stats in transport.stats().items():
+            log_to_gui(f"Board {name}: sent {stats['sent']}, dropped {stats['dropped']}, connects {stats['connects']}.")
+        self.connected = False
+        self.network_queue.set_offline(True)
+        log_to_gui("Network thread stopped.")
+        update_gui_connection_status(False)
+
+    # --- Speech Recognition Handling ---
+    def speech_recognition_manager(self):
+        """Manages microphone listening and speech-to-text conversion with the settings in `self.settings`."""
+        settings = self.settings
+        streaming = self.streaming
+        processes = self.worker_processes
+        # Load the model and open the translator connection now so it overlaps with the ambient-noise calibration below
+        if processes is not None:
+            processes.warm_up(settings)
+        else:
+            warm_up_recognizer(RECOGNIZER_BACKENDS[settings.recognizer_backend], settings.lang_code)
+            warm_up_translators(settings.translator_service, settings.hedge)
+        # Open the translation cache and seed the memory in the background as well
+        threading.Thread(target=get_translation_memory, daemon=True).start()
+
+        recognizer = sr.Recognizer()
+        # Adjust sensitivity based on environment if needed
+        # recognizer.energy_threshold = 4000
+        recognizer.dynamic_energy_threshold = DYNAMIC_ENERGY_THRESHOLD
+        if VAD_ENABLED and importlib.util.find_spec("numpy") is None:
+            log_to_gui("numpy is not installed; phrases are sent without silence trimming.")
+        # recognizer.pause_threshold = 0.8 # Seconds of non-speaking audio before phrase is considered complete
+
+        # Adjust for ambient noise, unless this device was calibrated recently
+        try:
+            microphone = self.microphone_factory() if self.microphone_factory else sr.Microphone()
+            device_key = CalibrationCache.device_key(microphone)
+            cached_threshold = get_calibration_cache().get(device_key)
+            if cached_threshold is not None:
+                recognizer.energy_threshold = cached_threshold
+                log_to_gui(f"Using saved calibration for this microphone (threshold {cached_threshold:.0f}). Ready to listen.")
+            else:
+                with microphone as source:
+                    log_to_gui("Adjusting for ambient noise... Please wait.")
+                    calibration_start = time.monotonic()
+                    recognizer.adjust_for_ambient_noise(source, duration=1)
+                    metrics.observe("calibration", time.monotonic() - calibration_start)
+                    log_to_gui("Ambient noise adjustment complete. Ready to listen.")
+                get_calibration_cache().put(device_key, recognizer.energy_threshold)
         except Exception as e:
-            log_to_gui(f"Error during audio processing or translation: {e}")
-
-    # Start listening in the background
-    log_to_gui(f"Starting microphone listener (Lang: {lang_code})...")
-    stop_mic_listening = recognizer.listen_in_background(microphone, audio_callback, phrase_time_limit=15) # phrase_time_limit helps break long pauses
-    log_to_gui("Microphone is now listening.")
-
-    # Keep the thread alive while listening is active and app is running
-    while is_listening and app_running:
-        time.sleep(0.1)
-
-    # Cleanup when stopped
-    if stop_mic_listening:
-        log_to_gui("Stopping microphone listener...")
-        stop_mic_listening(wait_for_stop=False) # Stop background listener
-        stop_mic_listening = None
-    log_to_gui("Microphone thread stopped.")
+            log_to_gui(f"Microphone Error: {e}. Cannot start listening.")
+            self.listening = False
+            update_gui_mic_status(False)
+            return
+
+        def send_translation(caption):
+            """Last stage: hand the translated phrase to the network thread."""
+            if caption.final:
+                log_to_gui(f"Translated: {format_caption_text(caption.text)}")
+                caption.timing.mark("released")
+            else:
+                log_to_gui(f"Provisional: {format_caption_text(caption.text)}")
+            if caption.final:
+                if not self.connected:
+                    log_to_gui("Board offline. Caption kept for replay on reconnect.")
+                self.network_queue.put(caption)
+            elif self.connected: # Provisional text is stale by the time the board is back
+                self.network_queue.put(caption)
+
+        # Recognize speech with the selected backend
+        # Use the language code selected in the GUI for recognition (`current` is the phrase's settings snapshot)
+        def recognize(audio, current):
+            if processes is not None:
+                return processes.recognize(audio, current.recognizer_backend, current.lang_code)
+            return RECOGNIZER_BACKENDS[current.recognizer_backend].recognize(recognizer, audio, current.lang_code)
+
+        def translate(texts, current, cache=True):
+            return [caption_for_targets(translations, current.target_lang_codes) for translations in
+                    translate_phrases(current.translator_service, texts, current.lang_code, current.target_lang_codes,
+                                      cache=cache, hedge=current.hedge, processes=processes)]
+
+        self.network_queue.restart_sequence() # The new pipeline numbers phrases from 0
+        # With worker processes, keep every process busy: one waiting thread per process and stage
+        workers = {"recognition_workers": processes.size, "translation_workers": processes.size} if processes else {}
+        pipeline = PhrasePipeline(
+            recognize=recognize,
+            # Translate the text (repeated phrases are served from the cache)
+            translate=translate,
+            sink=send_translation,
+            settings=lambda: self.settings, # Read when each phrase is captured, so changes apply at once
+            **workers,
+        )
+        pipeline.start()
+        metrics.set_gauge("recognition_queue_depth", pipeline.recognition_queue.qsize)
+        metrics.set_gauge("translation_queue_depth", pipeline.translation_queue.qsize)
+        partials = None
+        if streaming:
+            partials = PartialCaptioner(
+                recognize=recognize,
+                translate=lambda text, current: translate([text], current, cache=False)[0],
+                sink=send_translation,
+                sequencer=pipeline.sequencer,
+                settings=lambda: self.settings,
+            )
+            partials.start()
+
+        def audio_callback(recognizer, audio):
+            """Callback function executed when speech is detected."""
+            if not self.listening or not self.running: # Check if we should still be processing
+                return
+            segments = vad_segments(audio, recognizer.energy_threshold) if VAD_ENABLED else [audio]
+            if segments:
+                log_to_gui("Processing audio...")
+            for segment in segments:
+                pipeline.submit(segment)
+
+        def on_phrase_start():
+            return pipeline.sequencer.next_seq()
+
+        def on_window(seq, audio, from_phrase_start):
+            if self.listening and self.running:
+                partials.submit_window(seq, audio, from_phrase_start)
+
+        def on_phrase(seq, audio):
+            partials.finish(seq)
+            if audio is None or not self.listening or not self.running:
+                pipeline.sequencer.complete(seq, None) # Too short to be speech; release its slot
+                return
+            segments = vad_segments(audio, recognizer.energy_threshold) if VAD_ENABLED else [audio]
+            if not segments:
+                pipeline.sequencer.complete(seq, None)
+                return
+            log_to_gui("Processing audio...")
+            pipeline.submit(segments[0], seq)
+            for segment in segments[1:]: # Later pieces take the next slots; the next phrase has not started yet
+                pipeline.submit(segment)
+
+        # Start listening in the background
+        log_to_gui(f"Starting microphone listener (Lang: {settings.lang_code}{', streaming' if streaming else ''})...")
+        if streaming:
+            self.stop_mic_listening = listen_streaming_in_background(recognizer, microphone, on_phrase_start, on_window, on_phrase)
+        else:
+            self.stop_mic_listening = recognizer.listen_in_background(microphone, audio_callback, phrase_time_limit=PHRASE_TIME_LIMIT) # phrase_time_limit helps break long pauses
+        log_to_gui("Microphone is now listening.")
+
+        # Keep the thread alive while listening is active and app is running;
+        # meanwhile remember the threshold as it adapts to the room
+        while not self.listen_stop.wait(CALIBRATION_SAVE_INTERVAL):
+            if recognizer.dynamic_energy_threshold:
+                get_calibration_cache().put(device_key, recognizer.energy_threshold)
+        if recognizer.dynamic_energy_threshold:
+            get_calibration_cache().put(device_key, recognizer.energy_threshold)
+
+        # Cleanup when stopped
+        if self.stop_mic_listening:
+            log_to_gui("Stopping microphone listener...")
+            self.stop_mic_listening(wait_for_stop=False) # Stop background listener
+            self.stop_mic_listening = None
+        pipeline.stop()
+        metrics.set_gauge("recognition_queue_depth", None)
+        metrics.set_gauge("translation_queue_depth", None)
+        if partials:
+            partials.stop()
+        log_recognizer_latency()
+        stats = get_translation_cache().stats()
+        log_to_gui(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions.")
+        if TRANSLATION_MEMORY:
+            stats = get_translation_memory().stats()
+            log_to_gui(f"Translation memory: {stats['hits']} near-duplicate hits in {stats['lookups']} lookups.")
+        log_to_gui("Microphone thread stopped.")
+
+
+# --- GUI Log ---
+class LogBuffer:
+    """Log lines not yet shown in the widget, plus the line cap the widget is trimmed to.
+
+    The widget itself holds the visible history; only the newest `max_lines`
+    pending lines are kept, since older ones would be trimmed anyway.
+    """
+
+    def __init__(self, max_lines=LOG_MAX_LINES):
+        self.max_lines = max_lines
+        self.pending = deque(maxlen=max_lines)
+
+    def append(self, line):
+        self.pending.append(line)
+
+    def take_pending(self):
+        """Returns the lines added since the last call (at most the cap)."""
+        pending = list(self.pending)
+        self.pending.clear()
+        return pending
+
+def make_history_logger(path, max_bytes=LOG_FILE_MAX_BYTES, backups=LOG_FILE_BACKUPS):
+    """Logger that spills the full log history to a rotating file, or None when `path` is not set."""
+    if not path:
+        return None
+    logger = logging.getLogger("remote_control_translator.history")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    logger.addHandler(handler)
+    return logger
 
 
 # --- GUI Application ---
 class RemoteControlApp:
-    def __init__(self, master):
+    def __init__(self, master, core=None, log_file=LOG_FILE):
         self.master = master
+        self.core = core or PipelineCore()
+        self.log_buffer = LogBuffer()
+        self.history_logger = make_history_logger(log_file)
+        self.gui_tick_ms = GUI_TICK_MIN_MS
         master.title("Remote Control Translator")
-        master.geometry("600x500")
+        master.geometry("900x500")
 
         # Style
         self.style = ttk.Style()
@@ -240,9 +2712,15 @@ class RemoteControlApp:
         control_frame = ttk.Frame(master, padding="10")
         control_frame.pack(pady=5, padx=10, fill=tk.X)
 
+        targets_frame = ttk.Frame(master, padding=(10, 0))
+        targets_frame.pack(padx=10, fill=tk.X)
+
         status_frame = ttk.Frame(master, padding="10")
         status_frame.pack(pady=5, padx=10, fill=tk.X)
 
+        metrics_frame = ttk.Frame(master, padding=(10, 0))
+        metrics_frame.pack(padx=10, fill=tk.X)
+
         log_frame = ttk.Frame(master, padding="10")
         log_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
@@ -262,43 +2740,91 @@ class RemoteControlApp:
         self.lang_menu = ttk.OptionMenu(control_frame, self.lang_var, lang_options[0], *lang_options, command=self.update_settings)
         self.lang_menu.pack(side=tk.LEFT, padx=5)
 
+        # Extra target languages shown side by side with the main one
+        ttk.Label(targets_frame, text="Also translate to:").pack(side=tk.LEFT, padx=(5, 2))
+        self.extra_target_vars = {}
+        for lang_name in lang_options:
+            self.extra_target_vars[lang_name] = tk.BooleanVar(value=False)
+            ttk.Checkbutton(targets_frame, text=lang_name, variable=self.extra_target_vars[lang_name],
+                            command=self.update_settings).pack(side=tk.LEFT, padx=5)
+
         # Translator Selection
         ttk.Label(control_frame, text="Translator:").pack(side=tk.LEFT, padx=(10, 2))
         self.translator_var = tk.StringVar(value="Google") # Default to Google
         self.translator_menu = ttk.OptionMenu(control_frame, self.translator_var, "Google", "Google", "DeepL", command=self.update_settings)
         self.translator_menu.pack(side=tk.LEFT, padx=5)
 
+        # Speech Recognizer Selection
+        ttk.Label(control_frame, text="Recognizer:").pack(side=tk.LEFT, padx=(10, 2))
+        self.recognizer_var = tk.StringVar(value=RECOGNIZER_BACKEND)
+        recognizer_options = list(RECOGNIZER_BACKENDS.keys())
+        self.recognizer_menu = ttk.OptionMenu(control_frame, self.recognizer_var, RECOGNIZER_BACKEND, *recognizer_options, command=self.update_settings)
+        self.recognizer_menu.pack(side=tk.LEFT, padx=5)
+
+        # Provisional captions while a phrase is still being spoken
+        self.streaming_var = tk.BooleanVar(value=STREAMING_MODE)
+        self.streaming_check = ttk.Checkbutton(control_frame, text="Live captions", variable=self.streaming_var, command=self.update_settings)
+        self.streaming_check.pack(side=tk.LEFT, padx=5)
+
+        # Fall back to the other translator when the selected one is slow or failing
+        self.hedge_var = tk.BooleanVar(value=HEDGE_TRANSLATION)
+        self.hedge_check = ttk.Checkbutton(control_frame, text="Backup translator", variable=self.hedge_var, command=self.update_settings)
+        self.hedge_check.pack(side=tk.LEFT, padx=5)
+
         # --- Status Widgets ---
         self.conn_status_label = ttk.Label(status_frame, text="Connection: Disconnected", foreground="red")
         self.conn_status_label.pack(side=tk.LEFT, padx=5)
         self.mic_status_label = ttk.Label(status_frame, text="Microphone: Off", foreground="grey")
         self.mic_status_label.pack(side=tk.LEFT, padx=10)
-        self.current_settings_label = ttk.Label(status_frame, text=f"Target: {self.lang_var.get()} via {self.translator_var.get()}")
+        self.current_settings_label = ttk.Label(status_frame, text=self.settings_text())
         self.current_settings_label.pack(side=tk.LEFT, padx=10)
 
+        # --- Latency Panel ---
+        self.latency_label = ttk.Label(metrics_frame, text="Latency: no phrases yet", foreground="grey")
+        self.latency_label.pack(side=tk.LEFT, padx=5)
+        self.queue_label = ttk.Label(metrics_frame, text="", foreground="grey")
+        self.queue_label.pack(side=tk.RIGHT, padx=5)
+        self.reuse_label = ttk.Label(metrics_frame, text="", foreground="grey")
+        self.reuse_label.pack(side=tk.RIGHT, padx=5)
+
         # --- Log Area ---
         self.log_area = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=15, state=tk.DISABLED)
         self.log_area.pack(fill=tk.BOTH, expand=True)
 
         # --- Initial State ---
-        self.is_connecting = False # To prevent multiple connection attempts
+        self.is_connecting = False # True until the first connection succeeds ("Connecting" rather than "Reconnecting")
         master.protocol("WM_DELETE_WINDOW", self.on_closing) # Handle window close
 
         # Start GUI update loop
-        self.master.after(100, self.process_gui_queue)
+        self.master.after(self.gui_tick_ms, self.process_gui_queue)
+        self.master.after(1000, self.refresh_metrics)
 
     def log_message(self, message):
-        """Appends a message to the log area in a thread-safe way."""
+        """Queues a message for the log area; it is drawn with the next batch."""
+        self.log_buffer.append(f"{time.strftime('%H:%M:%S')} - {message}")
+        if self.history_logger:
+            self.history_logger.info(message)
+
+    def flush_log(self):
+        """Draws all pending log lines in one insert and trims the widget to the line cap."""
+        lines = self.log_buffer.take_pending()
+        if not lines:
+            return
         self.log_area.configure(state=tk.NORMAL)
-        self.log_area.insert(tk.END, f"{time.strftime('%H:%M:%S')} - {message}\n")
+        self.log_area.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(self.log_area.index("end-1c").split(".")[0]) - 1 - self.log_buffer.max_lines
+        if excess > 0:
+            self.log_area.delete("1.0", f"{excess + 1}.0")
         self.log_area.configure(state=tk.DISABLED)
         self.log_area.see(tk.END) # Scroll to the bottom
 
     def process_gui_queue(self):
         """Processes messages sent from other threads to update the GUI."""
+        handled = 0
         try:
-            while True:
+            while handled < GUI_MAX_MESSAGES_PER_TICK:
                 message = gui_queue.get_nowait()
+                handled += 1
                 if isinstance(message, tuple) and len(message) == 2:
                     msg_type, value = message
                     if msg_type == "log":
@@ -312,24 +2838,64 @@ class RemoteControlApp:
                 gui_queue.task_done()
         except queue.Empty:
             pass # No messages currently
+        self.flush_log()
 
-        # Reschedule the processor
-        if app_running:
-             self.master.after(100, self.process_gui_queue)
+        # Reschedule the processor: poll fast while messages arrive, back off when idle
+        if handled:
+            self.gui_tick_ms = GUI_TICK_MIN_MS
+        else:
+            self.gui_tick_ms = min(GUI_TICK_MAX_MS, self.gui_tick_ms * 2)
+        if self.core.running:
+             self.master.after(self.gui_tick_ms, self.process_gui_queue)
+
+    def refresh_metrics(self):
+        """Updates the latency and queue-depth panel once a second."""
+        summary = metrics.summary()
+        parts = [f"{label} {summary[stage]['p50']:.2f}s" for stage, label in (
+            ("calibration", "calibrate"), ("recognition", "recognize"), ("translation", "translate"),
+            ("network_queue_wait", "queue"), ("send", "send"), ("end_to_end", "total"),
+        ) if stage in summary]
+        if "end_to_end" in summary:
+            parts.append(f"(total p95 {summary['end_to_end']['p95']:.2f}s)")
+        if parts:
+            self.latency_label.config(text="Latency p50: " + " | ".join(parts), foreground="black")
+        cache_stats = translation_cache.stats() if translation_cache is not None else {"hits": 0, "misses": 0}
+        memory_stats = translation_memory.stats() if translation_memory is not None else {"hits": 0}
+        cache_lookups = cache_stats["hits"] + cache_stats["misses"]
+        if cache_lookups:
+            # Memory lookups only happen on exact-cache misses; both rates are of all lookups
+            self.reuse_label.config(text=f"Reused: cache {cache_stats['hits'] / cache_lookups:.0%}"
+                                         f" | memory {memory_stats['hits'] / cache_lookups:.0%}")
+        gauges = metrics.gauges()
+        self.queue_label.config(text="Queues: " + " ".join(
+            f"{name.replace('_queue_depth', '')} {value}" for name, value in sorted(gauges.items()) if name.endswith("_depth")))
+        if self.core.running:
+            self.master.after(1000, self.refresh_metrics)
 
     def _update_conn_status_label(self, connected):
-        """Updates the connection status label (called from GUI thread)."""
+        """Updates the connection status label (called from GUI thread).
+
+        A lost link that the network thread is still reconnecting keeps the
+        microphone listening (captions wait in the outbox); only a disconnect
+        stops it.
+        """
         if connected:
             self.conn_status_label.config(text="Connection: Connected", foreground="green")
             self.mic_button.config(state=tk.NORMAL) # Enable mic button on connect
             self.connect_button.config(text="Disconnect")
+            self.is_connecting = False
+        elif self.core.network_active():
+            status = "Connecting..." if self.is_connecting else "Reconnecting..."
+            self.conn_status_label.config(text=f"Connection: {status}", foreground="orange")
+            self.mic_button.config(state=tk.NORMAL)
+            self.connect_button.config(text="Disconnect") # Stops the reconnection attempts
         else:
             self.conn_status_label.config(text="Connection: Disconnected", foreground="red")
             self.mic_button.config(state=tk.DISABLED) # Disable mic button on disconnect
-            if is_listening: # Stop listening if connection is lost
+            if self.core.listening: # Stop listening once the connection is closed
                 self.toggle_mic()
             self.connect_button.config(text="Connect")
-        self.is_connecting = False # Reset connecting flag
+            self.is_connecting = False
 
 
     def _update_mic_status_label(self, listening):
@@ -340,117 +2906,83 @@ class RemoteControlApp:
          else:
             self.mic_status_label.config(text="Microphone: Off", foreground="grey")
             self.mic_button.config(text="Start Listening")
-            # Only enable mic button if connected
-            if is_connected:
+            # Only enable mic button if connected (or reconnecting)
+            if self.core.connected or self.core.network_active():
                 self.mic_button.config(state=tk.NORMAL)
             else:
                 self.mic_button.config(state=tk.DISABLED)
 
     def toggle_connection(self):
         """Starts or stops the network connection thread."""
-        global connection_thread, is_connected, app_running
-
-        if is_connected or self.is_connecting: # If connected or trying to connect, disconnect
-            if connection_thread and connection_thread.is_alive():
-                 log_to_gui("Disconnecting...")
-                 # Signal network thread to stop (details depend on network_manager loop)
-                 # A simple way is to put a sentinel value in the queue
-                 network_queue.put(None) # Signal thread to exit gracefully if waiting on queue
-                 # Optionally add a more robust stopping mechanism if needed
-
-                 # We don't forcefully join here, let the thread finish naturally
-                 # based on the sentinel or app_running flag.
-                 # Setting is_connected to False should be handled by the thread itself
-                 # or via the GUI queue update.
-
-            # Update GUI immediately for responsiveness
-            is_connected = False
+        if self.core.connected or self.core.network_active(): # If connected or trying to connect, disconnect
+            # The network thread exits on the queued sentinel and reports its own status;
+            # update the GUI immediately for responsiveness
+            self.core.disconnect()
             self._update_conn_status_label(False)
 
         else: # If disconnected, try to connect
+            # Start the network manager in a separate thread
+            if not self.core.connect():
+                log_to_gui("Still closing the previous connection; try again in a moment.")
+                return
             self.is_connecting = True
             self.conn_status_label.config(text="Connection: Connecting...", foreground="orange")
             self.connect_button.config(text="Connecting...") # Visually indicate attempt
 
-            # Ensure app_running is true before starting thread
-            app_running = True
 
-            # Start the network manager in a separate thread
-            connection_thread = threading.Thread(target=network_manager, args=(BOARD_IP, BOARD_PORT), daemon=True)
-            connection_thread.start()
+    def settings_text(self):
+        """Summary of the selected settings for the status bar."""
+        translator = self.translator_var.get() + (" + backup" if self.hedge_var.get() else "")
+        return f"Target: {', '.join(self.selected_target_names())} via {translator} (speech: {self.recognizer_var.get()})"
 
+    def selected_target_names(self):
+        """The main target language followed by any extra ones that are ticked."""
+        names = [self.lang_var.get()]
+        names.extend(name for name, var in self.extra_target_vars.items() if var.get() and name not in names)
+        return names
 
     def toggle_mic(self):
         """Starts or stops the microphone listening thread."""
-        global mic_thread, is_listening, stop_mic_listening, app_running
-
-        if is_listening:
-            # Stop listening
-            is_listening = False # Signal the thread/callback to stop processing
-            update_gui_mic_status(False) # Update GUI immediately
-            if stop_mic_listening:
-                log_to_gui("Requesting microphone stop...")
-                stop_mic_listening(wait_for_stop=False)
-                stop_mic_listening = None
-            if mic_thread and mic_thread.is_alive():
-                 mic_thread.join(timeout=1.0) # Wait briefly for thread to potentially exit
-                 if mic_thread.is_alive():
-                      log_to_gui("Warning: Mic thread did not stop cleanly.")
-
+        if self.core.listening:
+            self.core.stop_listening()
 
         else:
-            # Start listening only if connected
-            if not is_connected:
-                messagebox.showwarning("Not Connected", "Please connect to the board before starting the microphone.")
-                return
-
-            is_listening = True
-            update_gui_mic_status(True) # Update GUI immediately
-
             selected_target_lang = LANGUAGES[self.lang_var.get()]
+            selected_targets = [LANGUAGES[name] for name in self.selected_target_names()]
             selected_translator = self.translator_var.get()
             # Assume spoken language is same as target language for simplicity,
             # or choose a fixed input language e.g. 'en'
             # For auto-detection, SR language might be set differently
             selected_sr_lang = selected_target_lang # Or determine dynamically/configure
 
-            mic_thread = threading.Thread(target=speech_recognition_manager,
-                                          args=(selected_sr_lang, selected_translator, selected_target_lang),
-                                          daemon=True)
-            mic_thread.start()
+            # Start listening only if connected
+            if not self.core.start_listening(selected_sr_lang, selected_translator, selected_targets,
+                                             self.streaming_var.get(), self.recognizer_var.get(), self.hedge_var.get()):
+                messagebox.showwarning("Not Connected", "Please connect to the board before starting the microphone.")
 
     def update_settings(self, *args):
-        """Updates the current settings display when language or translator changes."""
-        self.current_settings_label.config(text=f"Target: {self.lang_var.get()} via {self.translator_var.get()}")
-        # If listening, potentially restart listener with new settings (optional)
-        if is_listening:
+        """Updates the settings display and applies the change to the running listener."""
+        self.current_settings_label.config(text=self.settings_text())
+        if not self.core.listening:
+            return
+        if self.streaming_var.get() != self.core.streaming:
+            # Live captions need a different listener loop, so only this change restarts the microphone
             log_to_gui("Settings changed. Restarting microphone listener...")
             self.toggle_mic() # Stop
             # Need a small delay to ensure thread stops before restarting
             self.master.after(500, self.toggle_mic) # Restart after delay
+        else:
+            # Everything else applies to the running listener; the microphone stream stays open
+            self.core.apply_settings(LANGUAGES[self.lang_var.get()], self.translator_var.get(),
+                                     [LANGUAGES[name] for name in self.selected_target_names()],
+                                     self.recognizer_var.get(), self.hedge_var.get())
 
 
     def on_closing(self):
         """Handles the application close event."""
-        global app_running, is_listening
-
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
             log_to_gui("Closing application...")
-            app_running = False # Signal all threads to stop
-
-            # Stop microphone listening first
-            if is_listening:
-                 is_listening = False
-                 if stop_mic_listening:
-                     stop_mic_listening(wait_for_stop=False)
-
-            # Signal network thread to stop
-            if connection_thread and connection_thread.is_alive():
-                 network_queue.put(None) # Sentinel value
-
-            # Wait briefly for threads to potentially finish
-            # time.sleep(1) # Optional: Give threads a moment
-
+            self.core.shutdown() # Signal all threads to stop
             self.master.destroy()
 
 # --- Helper functions to update GUI from other threads ---
@@ -477,11 +3009,90 @@ def update_gui_mic_status(listening):
 
 
 # --- Main Execution ---
-if __name__ == "__main__":
+def run_gui(args):
+    """Starts the Tk control panel."""
+    global tk, ttk, messagebox, scrolledtext
+    import tkinter as tk
+    from tkinter import ttk, messagebox, scrolledtext
+
+    start_metrics_export(args.metrics_port, args.metrics_file)
     root = tk.Tk()
-    app = RemoteControlApp(root)
+    app = RemoteControlApp(root, core=PipelineCore(execution_mode=args.execution_mode,
+                                                   process_pool_size=args.processes),
+                           log_file=args.log_file)
     root.mainloop()
 
     # Final cleanup check after GUI closes
-    app_running = False # Ensure flag is false
+    app.core.running = False # Ensure flag is false
     print("Application has exited.")
+
+def run_headless(args):
+    """Runs the pipeline without a GUI until SIGINT/SIGTERM, printing the log to stdout."""
+    core = PipelineCore(boards=args.boards, execution_mode=args.execution_mode, process_pool_size=args.processes)
+    start_metrics_export(args.metrics_port, args.metrics_file)
+    stop = threading.Event()
+    # Only set the event here: queue.Queue is not safe to use from a signal handler
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    core.connect()
+    while not stop.is_set():
+        try:
+            msg_type, value = gui_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if msg_type == "log":
+            print(f"{time.strftime('%H:%M:%S')} - {value}", flush=True)
+        elif msg_type == "conn_status" and value and not core.listening:
+            # Kiosk mode: (re)start listening whenever a board is reachable
+            core.start_listening(args.lang, args.translator, args.targets or [args.lang], args.streaming, args.recognizer,
+                                 args.hedge)
+
+    core.shutdown()
+    print("Application has exited.")
+
+def parse_board(value):
+    """argparse type for HOST:PORT."""
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got '{value}'")
+    return host, int(port)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Translate speech and send captions to display boards.")
+    parser.add_argument("--headless", action="store_true", help="run without the GUI (kiosk/daemon mode)")
+    parser.add_argument("--board", dest="boards", action="append", type=parse_board, metavar="HOST:PORT",
+                        help="board address; repeat for several boards (default: BOARDS)")
+    parser.add_argument("--lang", default=list(LANGUAGES.values())[0], choices=list(LANGUAGES.values()),
+                        help="spoken language, also the target unless --target is given (headless mode)")
+    parser.add_argument("--target", dest="targets", action="append", choices=list(LANGUAGES.values()),
+                        help="target language; repeat to show several languages side by side (headless mode)")
+    parser.add_argument("--translator", default="Google", choices=list(TRANSLATORS), help="translation service")
+    parser.add_argument("--recognizer", default=RECOGNIZER_BACKEND, choices=list(RECOGNIZER_BACKENDS),
+                        help="speech recognition engine")
+    parser.add_argument("--streaming", action="store_true", default=STREAMING_MODE, help="send provisional captions")
+    parser.add_argument("--hedge", action="store_true", default=HEDGE_TRANSLATION,
+                        help="ask the other translator too when the selected one is slow or failing")
+    parser.add_argument("--wire-format", default=WIRE_FORMAT, choices=["framed", "delta", "raw"],
+                        help="how captions are encoded for the board")
+    parser.add_argument("--execution-mode", default=EXECUTION_MODE, choices=["threads", "processes"],
+                        help="run recognition and translation in threads or in worker processes")
+    parser.add_argument("--processes", type=int, default=PROCESS_POOL_SIZE, metavar="N",
+                        help="worker processes in processes mode (default: CPU cores - 1)")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_HTTP_PORT, metavar="PORT",
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, metavar="PATH",
+                        help="write Prometheus metrics to PATH every few seconds")
+    parser.add_argument("--log-file", default=LOG_FILE, metavar="PATH",
+                        help="keep the full log history in a rotating file (GUI mode)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.boards:
+        BOARDS = args.boards
+    WIRE_FORMAT = args.wire_format
+    if args.headless:
+        run_headless(args)
+    else:
+        run_gui(args)
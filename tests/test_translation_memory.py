@@ -0,0 +1,41 @@
+import unittest
+
+import main
+
+
+class TranslationMemoryTest(unittest.TestCase):
+    def setUp(self):
+        self.memory = main.TranslationMemory(max_size=100, threshold=0.85)
+
+    def test_reuses_near_duplicate_with_new_number(self):
+        self.memory.add("Google", "en", "ar", "the flight to paris is now boarding at gate 12",
+                        "الرحلة إلى باريس تصعد الآن عند البوابة 12")
+        match = self.memory.lookup("Google", "en", "ar", "the flight to paris is boarding at gate 14")
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], "الرحلة إلى باريس تصعد الآن عند البوابة 14")
+
+    def test_dropped_filler_word_still_matches(self):
+        self.memory.add("Google", "en", "ar", "gate 12 is now boarding", "البوابة 12 تصعد الآن")
+        self.assertEqual(self.memory.lookup("Google", "en", "ar", "gate 12 now boarding")[0], "البوابة 12 تصعد الآن")
+
+    def test_added_filler_word_still_matches(self):
+        self.memory.add("Google", "en", "ar", "gate 12 now boarding", "البوابة 12 تصعد الآن")
+        self.assertEqual(self.memory.lookup("Google", "en", "ar", "gate 14 is now boarding")[0], "البوابة 14 تصعد الآن")
+
+    def test_negation_is_never_matched(self):
+        self.memory.add("Google", "en", "ar", "gate 12 is boarding", "البوابة 12 تصعد")
+        self.assertIsNone(self.memory.lookup("Google", "en", "ar", "gate 14 is not boarding"))
+
+    def test_swapped_words_are_never_matched(self):
+        self.memory.add("Google", "en", "ar", "the flight from paris to london is delayed",
+                        "الرحلة من باريس إلى لندن متأخرة")
+        self.assertIsNone(self.memory.lookup("Google", "en", "ar", "the flight from london to paris is delayed"))
+
+    def test_translations_are_kept_per_service(self):
+        self.memory.add("Google", "en", "ar", "the flight to paris is now boarding at gate 12",
+                        "الرحلة إلى باريس تصعد الآن عند البوابة 12")
+        self.assertIsNone(self.memory.lookup("DeepL", "en", "ar", "the flight to paris is boarding at gate 14"))
+
+
+if __name__ == "__main__":
+    unittest.main()
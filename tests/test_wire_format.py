@@ -0,0 +1,81 @@
+import json
+import unittest
+from unittest import mock
+
+import main
+
+
+def frame_kinds(data):
+    frames, rest = main.split_frames(data)
+    assert rest == b""
+    return [kind for kind, _ in frames]
+
+
+class DeltaRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.encoder = main.CaptionEncoder("delta")
+        self.decoder = main.CaptionDecoder()
+
+    def send(self, text, final=False, seq=0):
+        data = self.encoder.encode(main.Caption(seq, text, final))
+        captions = self.decoder.feed(data)
+        self.assertEqual(len(captions), 1)
+        return data, captions[0]
+
+    def test_multibyte_edits(self):
+        texts = ["مرحبا", "مرحبا بكم", "مرحبا بكم في 🎉 الحفل", "مرحباً بكم في 🎉🎊 الحفل", "Bienvenue à la fête 🎉",
+                 "Bienvenue à la fête 🎉 ce soir", "Bienvenue à la fête ce soir"]
+        for text in texts:
+            _, (kind, decoded) = self.send(text)
+            self.assertEqual(kind, main.FRAME_PROVISIONAL)
+            self.assertEqual(decoded, text)
+
+    def test_small_edit_is_sent_as_delta(self):
+        self.send("the flight to paris is now boarding at gate 12")
+        data, (_, decoded) = self.send("the flight to paris is now boarding at gate 14")
+        self.assertEqual(frame_kinds(data), [main.FRAME_DELTA])
+        self.assertEqual(decoded, "the flight to paris is now boarding at gate 14")
+
+    def test_multi_language_captions(self):
+        first = {"ar": "البوابة 12 تصعد الآن", "en": "gate 12 is now boarding"}
+        second = {"ar": "البوابة 14 تصعد الآن", "en": "gate 14 is now boarding", "fr": "porte 14 embarquement"}
+        _, (kind, decoded) = self.send(first)
+        self.assertEqual((kind, json.loads(decoded)), (main.FRAME_PROVISIONAL_MULTI, first))
+        _, (kind, decoded) = self.send(second, final=True)
+        self.assertEqual((kind, json.loads(decoded)), (main.FRAME_FINAL_MULTI, second))
+
+    def test_long_payloads_are_compressed(self):
+        text = "الرحلة المتجهة إلى باريس تصعد الآن. " * 20
+        data, (kind, decoded) = self.send(text, final=True)
+        self.assertEqual(frame_kinds(data), [main.FRAME_FINAL | main.FRAME_COMPRESSED])
+        self.assertEqual((kind, decoded), (main.FRAME_FINAL, text))
+
+    def test_reset_forces_a_full_frame(self):
+        self.send("gate 12 is now boarding")
+        self.encoder.reset()
+        self.decoder = main.CaptionDecoder() # A reconnected board starts blank
+        data, (_, decoded) = self.send("gate 14 is now boarding")
+        self.assertEqual(frame_kinds(data), [main.FRAME_PROVISIONAL])
+        self.assertEqual(decoded, "gate 14 is now boarding")
+
+    def test_resync_forces_a_full_frame(self):
+        with mock.patch.object(main.time, "monotonic", return_value=1000.0):
+            self.send("the flight to paris is now boarding at gate 12")
+        with mock.patch.object(main.time, "monotonic", return_value=1000.0 + main.DELTA_RESYNC_SECONDS / 2):
+            data, _ = self.send("the flight to paris is now boarding at gate 13")
+        self.assertEqual(frame_kinds(data), [main.FRAME_DELTA])
+        with mock.patch.object(main.time, "monotonic", return_value=1000.0 + main.DELTA_RESYNC_SECONDS + 1):
+            data, (_, decoded) = self.send("the flight to paris is now boarding at gate 14")
+        self.assertEqual(frame_kinds(data), [main.FRAME_PROVISIONAL])
+        self.assertEqual(decoded, "the flight to paris is now boarding at gate 14")
+
+    def test_frames_split_across_reads(self):
+        data = self.encoder.encode_batch([main.Caption(0, "gate 12", False), main.Caption(0, "gate 12 is boarding", True)])
+        captions = []
+        for n in range(len(data)):
+            captions.extend(self.decoder.feed(data[n:n + 1]))
+        self.assertEqual(captions, [(main.FRAME_PROVISIONAL, "gate 12"), (main.FRAME_FINAL, "gate 12 is boarding")])
+
+
+if __name__ == "__main__":
+    unittest.main()